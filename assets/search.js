@@ -0,0 +1,136 @@
+// Client for the index built by scripts/search_index.py. The manifest
+// carries the tokenizer settings, so queries are stemmed exactly like the
+// indexed text, and only the shards holding the query's terms are fetched.
+(function () {
+  const script = document.currentScript;
+  const manifestUrl = new URL('../search/manifest.json', script.src);
+  const siteRoot = new URL('..', manifestUrl);
+  const K1 = 1.2;
+  const B = 0.75;
+
+  let manifest = null;
+  const shards = new Map();
+
+  function loadManifest() {
+    manifest = manifest || fetch(manifestUrl, {cache: 'no-cache'}).then(r => {
+      if (!r.ok) throw new Error(`search manifest: ${r.status}`);
+      return r.json();
+    });
+    return manifest;
+  }
+
+  function loadShard(m, i) {
+    if (!shards.has(i)) {
+      shards.set(i, fetch(new URL(m.shards[i], manifestUrl)).then(r => r.json()));
+    }
+    return shards.get(i);
+  }
+
+  function stem(m, word) {
+    let best = null;
+    for (const [suffix, replacement] of m.rules) {
+      if (word.endsWith(suffix) && word.length - suffix.length >= m.min_stem &&
+          (!best || suffix.length > best[0].length)) best = [suffix, replacement];
+    }
+    if (best && best[0] !== best[1]) {
+      word = word.slice(0, -best[0].length) + best[1];
+      const last = word[word.length - 1];
+      if (!best[1] && word.length > m.min_stem && last === word[word.length - 2] && !'lsz'.includes(last)) {
+        word = word.slice(0, -1);
+      }
+    }
+    if (word.endsWith('e') && word.length > m.min_stem) word = word.slice(0, -1);
+    return word;
+  }
+
+  // [term, position] pairs, mirroring tokenize() in search_index.py
+  function tokenize(m, text) {
+    const stop = new Set(m.stopwords);
+    const words = text.normalize('NFKD').replace(/\p{M}/gu, '').toLowerCase().match(/[a-z0-9]+/g) || [];
+    const out = [];
+    words.forEach((word, position) => {
+      if (stop.has(word) || word.length > m.max_token || (word.length === 1 && !/\d/.test(word))) return;
+      out.push([stem(m, word), position]);
+    });
+    return out;
+  }
+
+  function shardOf(term, count) {
+    let h = 0x811c9dc5;
+    for (const byte of new TextEncoder().encode(term)) h = Math.imul(h ^ byte, 0x01000193) >>> 0;
+    return h % count;
+  }
+
+  // term -> Map(doc -> positions), undoing the gap encoding
+  function postings(list) {
+    const docs = new Map();
+    for (const [doc, ...gaps] of list || []) {
+      let position = 0;
+      docs.set(doc, gaps.map(gap => (position += gap)));
+    }
+    return docs;
+  }
+
+  function containsPhrase(phrase, doc, index) {
+    const [first, offset0] = phrase[0];
+    return index.get(first).get(doc).some(start => phrase.every(([term, offset]) =>
+      index.get(term).get(doc).includes(start + offset - offset0)));
+  }
+
+  // Documents containing every word (and every quoted phrase), best first
+  async function search(query) {
+    const m = await loadManifest();
+    const phrases = [...query.matchAll(/"([^"]+)"/g)].map(match => tokenize(m, match[1]))
+      .filter(phrase => phrase.length > 1);
+    const terms = [...new Set(tokenize(m, query.replace(/"/g, ' ')).map(([term]) => term))];
+    if (!terms.length) return [];
+
+    const needed = [...new Set(terms.map(term => shardOf(term, m.shards.length)))];
+    const loaded = new Map(await Promise.all(needed.map(async i => [i, await loadShard(m, i)])));
+    const index = new Map(terms.map(term => [term, postings(loaded.get(shardOf(term, m.shards.length))[term])]));
+
+    const total = m.docs.length;
+    const average = m.lengths.reduce((a, b) => a + b, 0) / total;
+    const [rarest] = terms.slice().sort((a, b) => index.get(a).size - index.get(b).size);
+    const results = [];
+    for (const doc of index.get(rarest).keys()) {
+      if (!terms.every(term => index.get(term).has(doc))) continue;
+      if (!phrases.every(phrase => containsPhrase(phrase, doc, index))) continue;
+      let score = 0;
+      for (const term of terms) {
+        const df = index.get(term).size;
+        const tf = index.get(term).get(doc).length;
+        const idf = Math.log(1 + (total - df + 0.5) / (df + 0.5));
+        score += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * m.lengths[doc] / average));
+      }
+      const [url, title, meta, summary] = m.docs[doc];
+      results.push({url: new URL(url, siteRoot).href, title, meta, summary, score});
+    }
+    return results.sort((a, b) => b.score - a.score);
+  }
+
+  window.siteSearch = search;
+
+  const form = document.querySelector('[data-search]');
+  if (!form) return;
+  const input = form.querySelector('input');
+  const list = form.querySelector('ol');
+  let latest = 0;
+  input.addEventListener('input', async () => {
+    const ticket = ++latest;
+    const results = input.value.trim() ? await search(input.value) : [];
+    if (ticket !== latest) return;
+    list.replaceChildren(...results.map(result => {
+      const item = document.createElement('li');
+      const link = item.appendChild(document.createElement('a'));
+      link.href = result.url;
+      link.textContent = result.title;
+      item.appendChild(document.createElement('div')).textContent = result.meta;
+      if (result.summary) item.appendChild(document.createElement('p')).textContent = result.summary;
+      return item;
+    }));
+  });
+  form.addEventListener('submit', event => event.preventDefault());
+  // The form stays hidden where the index was not built (the unbuilt tree)
+  loadManifest().then(() => { form.hidden = false; }, () => {});
+})();
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+import json
+import os
+import re
+import shutil
+import sys
+from urllib.parse import unquote
+
+from build_cache import OutputWriter, hash_bytes, replace_file
+from media import MEDIA_DIR
+from responsive_images import DERIVED_DIR
+from site_build import SITE_DIR, local_file, rewrite_pages, sub_outside_comments
+
+ASSETS_DIR = 'assets'
+MANIFEST_NAME = 'asset-manifest.json'
+HASH_CHARS = 10
+
+# Names that already carry a content hash in the form this stage writes
+# (also used by shared_css and critical_css), e.g. project.24de02ddc9.css
+HASHED_RE = re.compile(rf'\.[0-9a-f]{{{HASH_CHARS}}}\.[^.]+$')
+# Directories of files named by content hash (responsive_images, media),
+# e.g. clip-479f3e24-360p.mp4
+HASHED_DIRS = (DERIVED_DIR, MEDIA_DIR)
+
+REF_ATTR_RE = re.compile(r'''(\b(?:href|src|poster)\s*=\s*)(["'])(.*?)\2''', re.IGNORECASE)
+SRCSET_ATTR_RE = re.compile(r'''(\b(?:srcset|imagesrcset)\s*=\s*)(["'])(.*?)\2''', re.IGNORECASE)
+CSS_URL_RE = re.compile(r'''(url\(\s*["']?)([^"')]+)(["']?\s*\))''')
+SPLIT_REF_RE = re.compile(r'([^?#]*)(.*)', re.DOTALL)
+
+class AssetStore:
+    """Content-addressed copies of the assets of a site tree.
+
+    Each asset gets a sibling copy named <stem>.<hash><ext>; stylesheets
+    have their url() references rewritten before they are hashed, so a
+    changed image also gives every stylesheet using it a new name.
+    """
+
+    def __init__(self, site_dir):
+        self.site_dir = site_dir
+        self.assets_dir = os.path.abspath(os.path.join(site_dir, ASSETS_DIR))
+        self.files = {}
+        self.writer = OutputWriter()
+
+    def _key(self, path):
+        return os.path.relpath(path, self.site_dir).replace(os.sep, '/')
+
+    def _is_hashed(self, path):
+        directory = os.path.relpath(os.path.dirname(path), self.site_dir)
+        return bool(HASHED_RE.search(os.path.basename(path))) or directory in HASHED_DIRS
+
+    def hashed(self, path):
+        """Path of the content-addressed copy of path, creating it on first use"""
+        key = self._key(path)
+        if key in self.files:
+            return os.path.join(self.site_dir, self.files[key])
+        if path.endswith('.css'):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = self.rewrite_css(f.read(), os.path.dirname(path)).encode('utf-8')
+        else:
+            with open(path, 'rb') as f:
+                data = f.read()
+        stem, ext = os.path.splitext(path)
+        target = f"{stem}.{hash_bytes(data)[:HASH_CHARS]}{ext}"
+        if path.endswith('.css'):
+            self.writer.write(target, data.decode('utf-8'))
+        elif not os.path.exists(target):
+            shutil.copyfile(path, target)
+        self.files[key] = self._key(target)
+        return target
+
+    def resolve(self, ref, base_dir):
+        """ref rewritten to the content-addressed copy, or unchanged if it is not an asset"""
+        path_part, suffix = SPLIT_REF_RE.match(ref.strip()).groups()
+        if not path_part or path_part.startswith('data:'):
+            return ref
+        path = local_file(unquote(path_part), base_dir)
+        if not path or path.endswith('.html') or self._is_hashed(path) \
+                or not os.path.abspath(path).startswith(self.assets_dir + os.sep):
+            return ref
+        target = self.hashed(path)
+        return os.path.relpath(target, base_dir).replace(os.sep, '/') + suffix
+
+    def rewrite_css(self, css, base_dir):
+        return CSS_URL_RE.sub(lambda m: m.group(1) + self.resolve(m.group(2), base_dir) + m.group(3), css)
+
+    def rewrite_page(self, html, filepath):
+        """Point every src/href/poster/srcset and url() of a page at the hashed copies"""
+        page_dir = os.path.dirname(filepath)
+
+        def attr(match):
+            return f"{match.group(1)}{match.group(2)}{self.resolve(match.group(3), page_dir)}{match.group(2)}"
+
+        def srcset(match):
+            candidates = []
+            for candidate in match.group(3).split(','):
+                parts = candidate.strip().split(None, 1)
+                if parts:
+                    parts[0] = self.resolve(parts[0], page_dir)
+                candidates.append(' '.join(parts))
+            return f"{match.group(1)}{match.group(2)}{', '.join(candidates)}{match.group(2)}"
+
+        html = sub_outside_comments(REF_ATTR_RE, attr, html)
+        html = sub_outside_comments(SRCSET_ATTR_RE, srcset, html)
+        return self.rewrite_css(html, page_dir)
+
+def load_manifest(site_dir):
+    try:
+        with open(os.path.join(site_dir, MANIFEST_NAME), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'files': {}, 'previous': []}
+
+def prune(site_dir, manifest, files):
+    """Rotate generations and delete copies older than the previous deploy.
+
+    The copies of the last build stay for one more generation, so pages
+    still open (or cached) from the previous deploy keep working. Only
+    files this stage created are ever removed.
+    """
+    current = set(files.values())
+    last = set(manifest['files'].values())
+    if current == last:
+        return manifest['previous']
+    for name in set(manifest['previous']) - current - last:
+        path = os.path.join(site_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"Removed: {path}")
+    return sorted(last - current)
+
+def run(site_dir):
+    """Rename referenced assets by content hash and rewrite the pages to match"""
+    store = AssetStore(site_dir)
+    rewrite_pages(site_dir, store.rewrite_page)
+    manifest = load_manifest(site_dir)
+    previous = prune(site_dir, manifest, store.files)
+    replace_file(os.path.join(site_dir, MANIFEST_NAME),
+                 json.dumps({'files': store.files, 'previous': previous}, indent=1, sort_keys=True).encode('utf-8'))
+    print(f"Assets: {len(store.files)} file(s) content-addressed, {len(previous)} kept from the previous build")
+
+def main():
+    run(sys.argv[1] if len(sys.argv) > 1 else SITE_DIR)
+
+if __name__ == "__main__":
+    main()
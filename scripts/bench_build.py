@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPTS_DIR)
+DEFAULT_SIZES = [10, 500, 5000]
+
+WORDS = [
+    "language", "models", "knowledge", "probing", "entropy", "neurons", "parsing",
+    "contextual", "parametric", "transformers", "attention", "classification",
+    "interpretability", "retrieval", "conflicts", "representations", "Réduction",
+]
+NAMES = ["Z Tighidet", "A Mogini", "J Mei", "B Piwowarski", "P Gallinari", "N Ballier", "M Nadif"]
+VENUES = ["BlackBoxNLP@EMNLP2024", "SFC2023", "ALTA 2022", "EMNLP 2025", "ACL", "NAACL"]
+
+
+def synthetic_pubs(pages, seed=0):
+    """A pubs.json document with `pages` distinct publications"""
+    rng = random.Random(seed)
+    items = []
+    for n in range(pages):
+        title = f"{' '.join(rng.sample(WORDS, rng.randint(4, 9))).capitalize()} {n}"
+        items.append({
+            "title": title,
+            "authors": ", ".join(rng.sample(NAMES, rng.randint(2, 5))),
+            "venue": rng.choice(VENUES),
+            "year": str(rng.randint(2015, 2025)),
+        })
+    return {"source": "synthetic", "count": pages, "items": items}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def peak_rss_bytes():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_size(pages, seed=0):
+    """Build `pages` pages in a scratch tree and measure the full generation path.
+
+    Every page goes through create_project_page, a write to projects/ and
+    add_logos_to_project_page, the same steps as a real build. A second,
+    incremental site_build.build() over the unchanged pages is timed too.
+    """
+    from add_logos_to_projects import add_logos_to_project_page
+    from generate_updated_project_pages import create_project_page, page_targets
+    from site_build import OUTPUT_DIR, build
+
+    workdir = tempfile.mkdtemp(prefix="bench-build-")
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        # shared_css reads templates/ and writes assets/ relative to the tree
+        os.symlink(os.path.join(REPO_DIR, "templates"), "templates")
+        os.makedirs("assets")
+        os.makedirs(OUTPUT_DIR)
+        with open(os.path.join("assets", "pubs.json"), "w") as f:
+            json.dump(synthetic_pubs(pages, seed), f, ensure_ascii=False, indent=2)
+
+        latencies = []
+        written = 0
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            with open(os.path.join("assets", "pubs.json"), "r") as f:
+                items = json.load(f)["items"]
+            for i, paper in enumerate(items):
+                page_start = time.perf_counter()
+                filename, content = create_project_page(paper, i)
+                filepath = os.path.join(OUTPUT_DIR, filename)
+                with open(filepath, "w") as f:
+                    f.write(content)
+                add_logos_to_project_page(filepath)
+                latencies.append(time.perf_counter() - page_start)
+                # The page is written once rendered and again with its logos
+                written += len(content.encode("utf-8")) + os.path.getsize(filepath)
+            wall = time.perf_counter() - start
+
+            # Prime the build cache, then time a rebuild where nothing changed
+            build(page_targets(), force=True)
+            rebuild_start = time.perf_counter()
+            build(page_targets())
+            rebuild = time.perf_counter() - rebuild_start
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    latencies.sort()
+    latency_ms = {f"p{pct}": round(percentile(latencies, pct) * 1000, 4) for pct in (50, 90, 99)}
+    latency_ms["max"] = round(latencies[-1] * 1000, 4) if latencies else None
+    return {
+        "pages": pages,
+        "wall_seconds": round(wall, 6),
+        "pages_per_second": round(pages / wall, 1) if wall else None,
+        "latency_ms": latency_ms,
+        "bytes_written": written,
+        "incremental_rebuild_seconds": round(rebuild, 6),
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def git_revision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_isolated(pages, seed):
+    """Run one size in a fresh interpreter so peak RSS is not shared between sizes"""
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--single", str(pages),
+                             "--seed", str(seed)], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the project page build end to end")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="number of synthetic publications per run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="also write the JSON report to this file")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        print(json.dumps(run_size(args.single, args.seed)))
+        return
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": [],
+    }
+    for pages in args.sizes:
+        run = run_isolated(pages, args.seed)
+        report["runs"].append(run)
+        print(f"{pages:>6} pages: {run['wall_seconds']:.3f} s, p50 {run['latency_ms']['p50']} ms, "
+              f"p99 {run['latency_ms']['p99']} ms, {run['bytes_written']:,} bytes, "
+              f"peak RSS {run['peak_rss_bytes'] / 2**20:.1f} MiB", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+import argparse
+import collections
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from fetch_pubs import iter_publications, parse_publications
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_fixtures')
+DEFAULT_SIZES = [10, 1000, 100000]
+
+WORDS = [
+    "language", "models", "knowledge", "probing", "entropy", "neurons", "parsing",
+    "contextual", "parametric", "transformers", "attention", "classification",
+    "interpretability", "retrieval", "conflicts", "representations", "tokens",
+]
+NAMES = ["Z Tighidet", "A Mogini", "J Mei", "B Piwowarski", "P Gallinari", "N Ballier", "M Nadif"]
+VENUES = ["EMNLP", "ACL", "NAACL", "ALTA", "SFC", "ICLR", "TACL"]
+# Short lines the proxy emits between entries; none is long enough to be a title
+NOISE = ["Cited by 12", "Articles", "Public access", "Co-authors", "[PDF]", "* * *", "Sort by year"]
+BOT_PAGE = (
+    "Title: Sorry...\n\nOur systems have detected unusual traffic from your computer network. "
+    "This page checks to see if it's really you sending the requests, and not a robot.\n"
+)
+
+
+def synthetic_profile(entries, seed=0, noise=0.3, duplicates=0.05, bot=False):
+    """Scholar-like profile text plus the publications a correct parse returns.
+
+    Each entry is a title, an author line and a short "VENUE - YEAR" line,
+    optionally followed by noise lines. A fraction of entries repeat an
+    earlier title, which the parser must drop. With bot=True the text is
+    a bot-protection page and nothing should be returned.
+    """
+    rng = random.Random(seed)
+    # The reader proxy's header is consumed like a (too short to keep) entry
+    lines = ["URL Source: http://scholar.google.com/citations?user=synthetic", "My profile", "Sort by year"]
+    expected = []
+    seen = set()
+    titles = []
+    for n in range(entries):
+        if titles and rng.random() < duplicates:
+            title = rng.choice(titles)
+        else:
+            title = f"{' '.join(rng.sample(WORDS, rng.randint(4, 8))).capitalize()} {n}"
+            titles.append(title)
+        authors = ", ".join(rng.sample(NAMES, rng.randint(2, 4)))
+        year = str(rng.randint(1995, 2025))
+        venue = f"{rng.choice(VENUES)} - {year}"
+        lines += [title, authors, venue]
+        while rng.random() < noise:
+            lines.append(rng.choice(NOISE))
+        if title.lower() not in seen:
+            seen.add(title.lower())
+            expected.append({"title": title, "authors": authors, "venue": venue, "year": year})
+    if bot:
+        return BOT_PAGE + "\n".join(lines) + "\n", []
+    return "\n".join(lines) + "\n", expected
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def peak_memory(fn):
+    """Peak bytes allocated while fn runs (traced separately, it slows the run down)"""
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def stream(path, **kwargs):
+    """iter_publications over a file read line by line, so no copy of the whole text is held"""
+    with open(path, "r", encoding="utf-8") as f:
+        yield from iter_publications(f, **kwargs)
+
+
+def bench_size(entries, repeat=3, bot=False):
+    text, expected = synthetic_profile(entries, seed=entries, bot=bot)
+    report = {"entries": entries, "bot_page": bot, "bytes": len(text.encode("utf-8")), "parsers": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        # The streaming parser reads from a file, as from a socket; an
+        # in-memory copy of the input would count towards its peak
+        path = os.path.join(tmp, "profile.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        runs = {
+            # Whole-text parse, as fetch_pubs does by default
+            "parse_publications": (lambda: parse_publications(text, limit=None), None),
+            # Streaming; its memory is measured while consuming items one at a time
+            "iter_publications": (lambda: list(stream(path, limit=None)),
+                                  lambda: collections.deque(stream(path, limit=None), 0)),
+        }
+        for name, (fn, consume) in runs.items():
+            result, elapsed = min((timed(fn) for _ in range(repeat)), key=lambda run: run[1])
+            report["parsers"][name] = {
+                "seconds": round(elapsed, 6),
+                "items_per_second": round(entries / elapsed) if elapsed else None,
+                "peak_bytes": peak_memory(consume or fn),
+                "correct": result == expected,
+            }
+        _, first = timed(lambda: next(stream(path, limit=None), None))
+    report["parsers"]["iter_publications"]["first_result_seconds"] = round(first, 6)
+    return report
+
+
+def check_fixtures():
+    """Compare the parser against every golden fixture; returns failing names"""
+    failures = []
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if not name.endswith(".txt"):
+            continue
+        with open(os.path.join(FIXTURES_DIR, name), "r") as f:
+            text = f.read()
+        with open(os.path.join(FIXTURES_DIR, name[:-4] + ".json"), "r") as f:
+            golden = json.load(f)
+        if parse_publications(text, limit=golden["limit"]) != golden["items"]:
+            failures.append(name)
+    return failures
+
+
+def write_fixtures():
+    """Regenerate the golden fixtures from the synthetic corpus"""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    cases = {
+        "profile-10": (synthetic_profile(10, seed=10), 8),
+        "profile-10-all": (synthetic_profile(10, seed=10), None),
+        "duplicates": (synthetic_profile(40, seed=7, duplicates=0.5), None),
+        "bot-page": (synthetic_profile(10, seed=3, bot=True), 8),
+    }
+    for name, ((text, expected), limit) in cases.items():
+        with open(os.path.join(FIXTURES_DIR, name + ".txt"), "w") as f:
+            f.write(text)
+        items = expected if limit is None else expected[:limit]
+        with open(os.path.join(FIXTURES_DIR, name + ".json"), "w") as f:
+            json.dump({"limit": limit, "items": items}, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"Wrote: {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Scholar profile parser")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="number of synthetic entries per run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size; the fastest is reported")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    parser.add_argument("--write-fixtures", action="store_true", help="regenerate the golden fixtures")
+    args = parser.parse_args()
+
+    if args.write_fixtures:
+        write_fixtures()
+        return
+
+    failures = check_fixtures()
+    reports = [bench_size(n, args.repeat) for n in args.sizes]
+    reports.append(bench_size(max(args.sizes), args.repeat, bot=True))
+
+    if args.json:
+        print(json.dumps({"fixture_failures": failures, "runs": reports}, indent=2))
+    else:
+        print(f"{'entries':>8} {'bot':>4} {'parser':<20} {'items/s':>12} {'peak KiB':>10} {'first ms':>9} correct")
+        for report in reports:
+            for name, stats in report["parsers"].items():
+                first = stats.get("first_result_seconds")
+                print(f"{report['entries']:>8} {'yes' if report['bot_page'] else 'no':>4} {name:<20} "
+                      f"{stats['items_per_second'] or 0:>12,} {stats['peak_bytes'] / 1024:>10.1f} "
+                      f"{'' if first is None else f'{first * 1000:.3f}':>9} {stats['correct']}")
+        print(f"Golden fixtures: {'all passed' if not failures else 'FAILED ' + ', '.join(failures)}")
+    if failures or not all(s["correct"] for r in reports for s in r["parsers"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+import hashlib
+import json
+import os
+import re
+
+CACHE_DIR = '.build-cache'
+PAGES_CACHE = os.path.join(CACHE_DIR, 'pages.json')
+
+# Local references inside generated HTML (href="..." / src="...")
+REF_RE = re.compile(r'''(?:href|src)\s*=\s*["']([^"'#?]+)''')
+
+def hash_bytes(data):
+    """Return the hex content hash of a bytes object"""
+    return hashlib.sha256(data).hexdigest()
+
+def hash_text(text):
+    """Return the content hash of a string"""
+    return hash_bytes(text.encode('utf-8'))
+
+def hash_json(obj):
+    """Return a stable content hash of a JSON-serialisable object"""
+    return hash_text(json.dumps(obj, sort_keys=True, ensure_ascii=False))
+
+def hash_file(path):
+    """Return the content hash of a file, or None if it does not exist"""
+    try:
+        with open(path, 'rb') as f:
+            return hash_bytes(f.read())
+    except FileNotFoundError:
+        return None
+
+def replace_file(path, data):
+    """Write bytes to path through a sibling temp file and os.replace.
+
+    Readers see either the old file or the complete new one, never a
+    truncated page, even if the build is interrupted mid-write.
+    """
+    tmp = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+class OutputWriter:
+    """Write-if-changed for build outputs.
+
+    Existing files are compared by size first and by hash only when the
+    sizes match; identical files are left alone so their mtime, the git
+    diff and the deploy upload stay quiet. Changed files are replaced
+    atomically.
+    """
+
+    def __init__(self):
+        self.written = 0
+        self.skipped = 0
+
+    def write(self, path, content):
+        """Write str or bytes content to path; returns False if it was already identical"""
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        try:
+            unchanged = os.path.getsize(path) == len(data) and hash_file(path) == hash_bytes(data)
+        except FileNotFoundError:
+            unchanged = False
+        if unchanged:
+            self.skipped += 1
+            return False
+        replace_file(path, data)
+        self.written += 1
+        return True
+
+    def summary(self):
+        return f"{self.written} file(s) written, {self.skipped} unchanged"
+
+def find_local_refs(html, output_path):
+    """List the local files an HTML page references, relative to the repo root"""
+    base = os.path.dirname(output_path)
+    refs = set()
+    for ref in REF_RE.findall(html):
+        if re.match(r'^[a-z][a-z0-9+.-]*:', ref, re.I) or ref.startswith('//'):
+            continue
+        refs.add(os.path.normpath(os.path.join(base, ref)))
+    return sorted(refs)
+
+class BuildCache:
+    """Dependency graph of generated pages keyed by content hash.
+
+    Each record maps a target key to the output it produced, the hashes
+    of the inputs it was rendered from, and the hashes of the local files
+    the output references. File hashes are memoised on (mtime, size) so an
+    unchanged tree can be checked without re-reading every asset.
+    """
+
+    def __init__(self, path=PAGES_CACHE):
+        self.path = path
+        self.targets = {}
+        self.stats = {}
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                self.targets = data.get('targets', {})
+                self.stats = data.get('stats', {})
+            except (OSError, ValueError):
+                pass
+
+    def file_hash(self, path):
+        """Content hash of a file, reusing the memo when its stat is unchanged"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        stamp = [st.st_mtime_ns, st.st_size]
+        memo = self.stats.get(path)
+        if memo and memo[:2] == stamp:
+            return memo[2]
+        digest = hash_file(path)
+        self.stats[path] = stamp + [digest]
+        self.dirty = True
+        return digest
+
+    def is_fresh(self, key, inputs):
+        """True if the target's inputs, dependencies and output are all unchanged"""
+        record = self.targets.get(key)
+        if not record or record['inputs'] != inputs:
+            return False
+        if self.file_hash(record['output']) != record['output_hash']:
+            return False
+        for path, digest in record['deps'].items():
+            if self.file_hash(path) != digest:
+                return False
+        return True
+
+    def record(self, key, output, inputs, content):
+        """Remember what a target was built from after writing its output"""
+        self.targets[key] = {
+            'output': output,
+            'output_hash': self.file_hash(output) or hash_text(content),
+            'inputs': inputs,
+            'deps': {path: self.file_hash(path) for path in find_local_refs(content, output)},
+        }
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = json.dumps({'targets': self.targets, 'stats': self.stats}, indent=1, sort_keys=True)
+        replace_file(self.path, data.encode('utf-8'))
+        self.dirty = False
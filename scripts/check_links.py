@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote
+
+from build_cache import CACHE_DIR, hash_bytes, hash_file, replace_file
+from postprocess import PARALLEL_THRESHOLD, iter_tokens
+from site_build import EXTERNAL_RE, parse_attrs
+
+LINKS_CACHE = os.path.join(CACHE_DIR, 'links.json')
+
+# Directories that are not served as they are: templates still hold
+# {{ slots }}, and dot/underscore directories are build outputs or caches
+SKIP_DIRS = ('templates', 'node_modules')
+
+REF_ATTRS = ('href', 'src', 'poster')
+SRCSET_ATTRS = ('srcset', 'imagesrcset')
+CSS_URL_RE = re.compile(r'''url\(\s*["']?([^"')]+)["']?\s*\)''')
+# Fragments every HTML page has
+IMPLICIT_ANCHORS = ('', 'top')
+
+def discover(root):
+    """HTML and CSS files of the tree, relative to root"""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(('.', '_')) and d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            if name.endswith(('.html', '.css')):
+                found.append(os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, '/'))
+    return found
+
+def _css_refs(css, line):
+    return [[line + css.count('\n', 0, m.start()), m.group(1)] for m in CSS_URL_RE.finditer(css)]
+
+def parse(text, is_css):
+    """Anchor ids and [line, reference] pairs of one document"""
+    if is_css:
+        return {'ids': [], 'refs': _css_refs(text, 1)}
+    ids = []
+    refs = []
+    line = 1
+    in_style = False
+    for token in iter_tokens(text):
+        if token.kind == 'start':
+            attrs = parse_attrs(token.raw)
+            if attrs.get('id'):
+                ids.append(attrs['id'])
+            if token.tag == 'a' and attrs.get('name'):
+                ids.append(attrs['name'])
+            refs.extend([line, attrs[a]] for a in REF_ATTRS if attrs.get(a))
+            for a in SRCSET_ATTRS:
+                for candidate in (attrs.get(a) or '').split(','):
+                    if candidate.strip():
+                        refs.append([line, candidate.split()[0]])
+            if attrs.get('style'):
+                refs.extend(_css_refs(attrs['style'], line))
+            in_style = token.tag == 'style'
+        elif token.kind == 'text' and in_style:
+            refs.extend(_css_refs(token.raw, line))
+        else:
+            in_style = False
+        line += token.raw.count('\n')
+    return {'ids': ids, 'refs': refs}
+
+def _parse_file(args):
+    path, digest = args
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        result = parse(f.read(), path.endswith('.css'))
+    result['hash'] = digest
+    return result
+
+class LinkChecker:
+    """Resolve every internal reference of a tree against its files and anchors.
+
+    Parsing is the expensive part, so each document's ids and references
+    are cached by content hash and only changed files are parsed again
+    (over a process pool when there are many). Resolution always runs
+    over the whole tree, since a page breaks when its target changes too.
+    """
+
+    def __init__(self, root, cache_path=LINKS_CACHE, jobs=0):
+        self.root = root
+        self.cache_path = cache_path
+        self.jobs = jobs or os.cpu_count() or 1
+        self.version = hash_file(__file__)
+        self.docs = {}
+        self.parsed = 0
+        self._exists = {}
+
+    def _load_cache(self):
+        """The whole cache file; each checked tree has its own entry"""
+        try:
+            with open(self.cache_path, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        if cache.get('version') != self.version:
+            cache = {'version': self.version, 'trees': {}}
+        return cache
+
+    def load(self, files):
+        cache = self._load_cache()
+        tree = os.path.abspath(self.root)
+        cached = cache['trees'].get(tree, {})
+        stale = []
+        for name in files:
+            with open(os.path.join(self.root, name), 'rb') as f:
+                digest = hash_bytes(f.read())
+            if name in cached and cached[name]['hash'] == digest:
+                self.docs[name] = cached[name]
+            else:
+                stale.append((name, digest))
+        args = [(os.path.join(self.root, name), digest) for name, digest in stale]
+        if self.jobs == 1 or len(args) < PARALLEL_THRESHOLD:
+            results = list(map(_parse_file, args))
+        else:
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                results = list(pool.map(_parse_file, args, chunksize=max(1, len(args) // (self.jobs * 4))))
+        for (name, _), result in zip(stale, results):
+            self.docs[name] = result
+        self.parsed = len(stale)
+        if stale or set(cached) != set(files):
+            cache['trees'][tree] = {name: self.docs[name] for name in files}
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            replace_file(self.cache_path, json.dumps(cache, separators=(',', ':')).encode('utf-8'))
+
+    def _is_file(self, path):
+        if path not in self._exists:
+            self._exists[path] = os.path.isfile(os.path.join(self.root, path))
+        return self._exists[path]
+
+    def _anchors(self, target):
+        if target not in self.docs:
+            self.docs[target] = _parse_file((os.path.join(self.root, target), None))
+        return set(self.docs[target]['ids'])
+
+    def resolve(self, name, ref):
+        """None if ref from document name resolves, else the reason it does not"""
+        ref = ref.strip()
+        if not ref or EXTERNAL_RE.match(ref) or '{{' in ref:
+            return None
+        path, _, fragment = ref.partition('#')
+        path = unquote(path.split('?')[0])
+        if not path:
+            target = name
+        elif path.startswith('/'):
+            target = os.path.normpath(path.lstrip('/'))
+        else:
+            target = os.path.normpath(os.path.join(os.path.dirname(name), path))
+        target = target.replace(os.sep, '/')
+        if target.startswith('../') or target == '..':
+            return 'points outside the site'
+        if not self._is_file(target):
+            if self._is_file(f"{target}/index.html"):
+                target = f"{target}/index.html"
+            else:
+                return 'missing file'
+        if target.endswith('.html') and unquote(fragment) not in IMPLICIT_ANCHORS \
+                and unquote(fragment) not in self._anchors(target):
+            return f"no #{unquote(fragment)} in {target}"
+        return None
+
+    def check(self, files):
+        """[(document, line, reference, reason)] for every broken reference"""
+        self.load(files)
+        problems = []
+        for name in files:
+            for line, ref in self.docs[name]['refs']:
+                reason = self.resolve(name, ref)
+                if reason:
+                    problems.append((name, line, ref, reason))
+        return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that internal links, assets and anchors resolve")
+    parser.add_argument('root', nargs='?', default='.', help="tree to check (default: the source tree)")
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help="parse changed files in N worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    files = discover(args.root)
+    checker = LinkChecker(args.root, jobs=args.jobs)
+    problems = checker.check(files)
+    for name, line, ref, reason in problems:
+        print(f"{name}:{line}: {ref}: {reason}")
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Checked {len(files)} file(s), {checker.parsed} parsed, {len(problems)} broken reference(s) "
+          f"in {elapsed:.0f} ms")
+    sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
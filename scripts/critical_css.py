@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+import os
+import re
+import sys
+
+from build_cache import OutputWriter, hash_text
+from postprocess import iter_tokens
+from site_build import SITE_DIR, local_file, parse_attrs, rewrite_pages
+
+PAGES = ['*.html', 'projects/*.html']
+
+# How much of the <body> markup counts as the first screen
+FOLD_CHARS = 6000
+# Inline <style> blocks larger than this are moved to an external,
+# fingerprinted stylesheet and only their critical rules stay inline
+INLINE_LIMIT = 4096
+
+# Stylesheets of the <head>; <noscript> fallbacks are matched only to be left alone
+HEAD_CSS_RE = re.compile(r'<noscript>.*?</noscript>|<style>(?P<css>.*?)</style>|<link\b[^>]*>',
+                         re.DOTALL | re.IGNORECASE)
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+PSEUDO_RE = re.compile(r'::?[\w-]+(\([^)]*\))?')
+COMBINATOR_RE = re.compile(r'\s*[>+~]\s*|\s+')
+COMPOUND_RE = re.compile(r'^([a-zA-Z][\w-]*|\*)?')
+CLASS_RE = re.compile(r'\.([\w-]+)')
+ID_RE = re.compile(r'#([\w-]+)')
+ATTR_SEL_RE = re.compile(r'\[\s*([\w-]+)')
+
+# At-rules that apply to the whole page and are always kept
+GLOBAL_AT_RULES = ('@font-face', '@charset', '@import', '@property')
+
+def split_rules(css):
+    """Top-level (prelude, body) pairs of a stylesheet; statements like @import have body None"""
+    css = COMMENT_RE.sub('', css)
+    rules = []
+    pos = 0
+    while True:
+        brace = css.find('{', pos)
+        semi = css.find(';', pos)
+        if semi != -1 and (brace == -1 or semi < brace) and css[pos:semi].strip().startswith('@'):
+            rules.append((css[pos:semi].strip(), None))
+            pos = semi + 1
+            continue
+        if brace == -1:
+            return rules
+        depth = 0
+        for end in range(brace, len(css)):
+            if css[end] == '{':
+                depth += 1
+            elif css[end] == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+        rules.append((css[pos:brace].strip(), css[brace + 1:end]))
+        pos = end + 1
+
+def above_the_fold(html):
+    """Tag names, classes, ids and attribute names used in the first screen of the body"""
+    body = re.search(r'<body\b', html, re.IGNORECASE)
+    start = body.start() if body else 0
+    used = {'tags': {'html', 'body', '*'}, 'classes': set(), 'ids': set(), 'attrs': set()}
+    for token in iter_tokens(html[start:start + FOLD_CHARS]):
+        if token.kind != 'start':
+            continue
+        attrs = parse_attrs(token.raw)
+        used['tags'].add(token.tag)
+        used['classes'].update((attrs.get('class') or '').split())
+        if attrs.get('id'):
+            used['ids'].add(attrs['id'])
+        used['attrs'].update(attrs)
+    return used
+
+def selector_used(selector, used):
+    """True unless the selector names a tag, class, id or attribute absent from the first screen"""
+    selector = PSEUDO_RE.sub('', selector).strip()
+    if not selector:
+        return True
+    for compound in COMBINATOR_RE.split(selector):
+        tag = COMPOUND_RE.match(compound).group(1)
+        if tag and tag.lower() not in used['tags']:
+            return False
+        if any(c not in used['classes'] for c in CLASS_RE.findall(compound)):
+            return False
+        if any(i not in used['ids'] for i in ID_RE.findall(compound)):
+            return False
+        if any(a.lower() not in used['attrs'] for a in ATTR_SEL_RE.findall(compound)):
+            return False
+    return True
+
+def critical_rules(css, used):
+    """The subset of css needed to paint the first screen, as compact CSS"""
+    out = []
+    for prelude, body in split_rules(css):
+        if body is None:
+            continue
+        if prelude.startswith('@'):
+            if prelude.startswith(GLOBAL_AT_RULES):
+                out.append(f"{prelude}{{{body.strip()}}}")
+            elif prelude.startswith(('@media', '@supports')):
+                inner = critical_rules(body, used)
+                if inner:
+                    out.append(f"{prelude}{{{inner}}}")
+            continue
+        selectors = [s.strip() for s in prelude.split(',')]
+        if any(selector_used(s, used) for s in selectors):
+            out.append(f"{prelude}{{{' '.join(body.split())}}}")
+    return ''.join(out)
+
+def deferred_link(href):
+    """Non-blocking stylesheet load, with a <noscript> fallback"""
+    return (f'<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            f'<noscript><link rel="stylesheet" href="{href}"></noscript>')
+
+def externalize(css, page, site_dir):
+    """Write an inline stylesheet to assets/<page>.<hash>.css; returns its page-relative URL"""
+    stem = os.path.splitext(os.path.basename(page))[0]
+    name = f"{stem}.{hash_text(css)[:10]}.css"
+    path = os.path.join(site_dir, 'assets', name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    OutputWriter().write(path, css)
+    return os.path.relpath(path, os.path.dirname(page)).replace(os.sep, '/')
+
+def inline_critical(html, filepath, site_dir):
+    """Inline the first-screen rules of each blocking stylesheet and defer the rest"""
+    page_dir = os.path.dirname(filepath)
+    used = None
+
+    def replace(match):
+        nonlocal used
+        tag = match.group(0)
+        if match.group('css') is not None:
+            css = match.group('css')
+            if len(css) <= INLINE_LIMIT:
+                return tag
+            href = externalize(css, filepath, site_dir)
+        elif tag.lower().startswith('<link'):
+            attrs = parse_attrs(tag)
+            href = attrs.get('href')
+            path = local_file(href, page_dir)
+            if (attrs.get('rel') or '').lower() != 'stylesheet' or 'media' in attrs \
+                    or not path or not path.endswith('.css'):
+                return tag
+            with open(path, 'r') as f:
+                css = f.read()
+        else:
+            return tag
+        used = used or above_the_fold(html)
+        return f"<style>{critical_rules(css, used)}</style>{deferred_link(href)}"
+
+    head_end = html.lower().find('</head>')
+    if head_end == -1:
+        return html
+    return HEAD_CSS_RE.sub(replace, html[:head_end]) + html[head_end:]
+
+def run(site_dir):
+    """Inline critical CSS in every page of the site tree"""
+    rewrite_pages(site_dir, lambda html, filepath: inline_critical(html, filepath, site_dir), PAGES)
+
+def main():
+    run(sys.argv[1] if len(sys.argv) > 1 else SITE_DIR)
+
+if __name__ == "__main__":
+    main()
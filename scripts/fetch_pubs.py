@@ -1,85 +1,536 @@
 #!/usr/bin/env python3
+import argparse
+import collections
+import hashlib
 import json
+import os
+import random
 import re
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
 from urllib.request import Request, urlopen
 
 PROFILE_URL = "https://r.jina.ai/http://scholar.google.com/citations?user=jgle1SAAAAAJ&hl=en&view_op=list_works&sortby=pubdate"
 HEADERS = {"User-Agent": "Mozilla/5.0"}
 
+HTTP_CACHE_DIR = os.path.join('.build-cache', 'http')
+BREAKER_PATH = os.path.join(HTTP_CACHE_DIR, 'breaker.json')
+LAST_GOOD_PATH = os.path.join(HTTP_CACHE_DIR, 'last-good.json')
+PUBS_PATH = os.path.join('assets', 'pubs.json')
+CACHE_TTL = 3600
+CACHE_MAX_BYTES = 20 * 1024 * 1024
 
-def fetch_text(url: str) -> str:
-    req = Request(url, headers=HEADERS)
-    with urlopen(req, timeout=20) as resp:
-        return resp.read().decode("utf-8", errors="ignore")
+BOT_MARKERS = ("automated queries", "protect our users", "unusual traffic")
+SKIP_PREFIXES = ("my profile", "articles", "cited by", "co-authors", "public access")
+PAGE_SIZE = 100
+MAX_PAGES = 50
+HOST_CONCURRENCY = 4
+HOST_MIN_INTERVAL = 0.5
 
+REQUEST_TIMEOUT = 20
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 6 * 3600
 
-def parse_publications(text: str):
-    # Detect bot-protection pages and bail out
+YEAR_RE = re.compile(r"\b(20\d{2}|19\d{2})\b")
+
+
+class BotProtectionError(Exception):
+    """The proxy returned Scholar's "unusual traffic" page instead of the profile"""
+
+
+class CircuitOpenError(Exception):
+    """Too many recent failures; requests are suspended until the cooldown ends"""
+
+
+def is_bot_page(text: str) -> bool:
     lower = text.lower()
-    if "automated queries" in lower or "protect our users" in lower or "unusual traffic" in lower:
-        return []
+    return any(marker in lower for marker in BOT_MARKERS)
+
+
+def with_retries(call, attempts: int = RETRY_ATTEMPTS, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY):
+    """Run call(), retrying transient failures with capped exponential backoff and full jitter.
+
+    Timeouts, connection errors, 429 and 5xx responses are retried; other
+    HTTP errors (including 304) and bot-protection pages are raised at once.
+    """
+    for attempt in range(attempts):
+        try:
+            return call()
+        except HTTPError as e:
+            if e.code != 429 and e.code < 500:
+                raise
+            error = e
+        except (URLError, TimeoutError, ConnectionError) as e:
+            error = e
+        if attempt == attempts - 1:
+            raise error
+        delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+        print(f"Retrying in {delay:.1f}s after: {error}", file=sys.stderr)
+        time.sleep(delay)
+
+
+def _request(url: str, headers: dict):
+    """GET url with retries; returns (body, response headers)"""
+    def attempt():
+        with urlopen(Request(url, headers=headers), timeout=REQUEST_TIMEOUT) as resp:
+            return resp.read(), resp.headers
+    return with_retries(attempt)
+
+
+def fetch_text(url: str) -> str:
+    body, _ = _request(url, HEADERS)
+    text = body.decode("utf-8", errors="ignore")
+    if is_bot_page(text):
+        raise BotProtectionError(url)
+    return text
+
+
+class CircuitBreaker:
+    """Persistent breaker that stops requests after repeated failed runs.
+
+    After `threshold` consecutive failures the breaker opens for
+    `cooldown` seconds; the first run after that is a trial that either
+    closes it again or re-opens it.
+    """
+
+    def __init__(self, path: str = BREAKER_PATH, threshold: int = BREAKER_THRESHOLD,
+                 cooldown: float = BREAKER_COOLDOWN):
+        self.path = path
+        self.threshold = threshold
+        self.cooldown = cooldown
+        try:
+            with open(path, "r") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {"failures": 0, "opened_at": None}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.state, f)
+
+    def allow(self) -> bool:
+        opened_at = self.state.get("opened_at")
+        return opened_at is None or time.time() - opened_at >= self.cooldown
+
+    def record_success(self):
+        if self.state != {"failures": 0, "opened_at": None}:
+            self.state = {"failures": 0, "opened_at": None}
+            self._save()
+
+    def record_failure(self):
+        self.state["failures"] += 1
+        if self.state["failures"] >= self.threshold:
+            self.state["opened_at"] = time.time()
+        self._save()
+
+
+def fetch_resilient(fetch, breaker: CircuitBreaker):
+    """Run fetch() behind the circuit breaker; empty results count as failures"""
+    if not breaker.allow():
+        raise CircuitOpenError("too many recent failures, not contacting the profile proxy")
+    try:
+        pubs = fetch()
+        if not pubs:
+            raise ValueError("no publications found in the profile")
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return pubs
+
+
+def load_last_good():
+    """The last successfully published output, or None"""
+    for path in (LAST_GOOD_PATH, PUBS_PATH):
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if data.get("items"):
+            return data
+    return None
+
+
+def write_json(path: str, data: dict):
+    """Atomically replace path with data"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(json.dumps(data, ensure_ascii=False, indent=2))
+    os.replace(tmp, path)
+
+
+class HttpCache:
+    """On-disk response cache with TTL, revalidation validators and LRU eviction.
+
+    Each URL gets three files named by its hash: the response body, a
+    metadata record (validators, fetch and last-use times, size) and,
+    once computed, the parse result for that body.
+    """
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR, ttl: float = CACHE_TTL,
+                 max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    def _path(self, url: str, suffix: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, key + suffix)
+
+    def meta(self, url: str):
+        try:
+            with open(self._path(url, ".meta.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, url: str, meta: dict):
+        meta["used_at"] = time.time()
+        with open(self._path(url, ".meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    def is_fresh(self, meta: dict) -> bool:
+        return time.time() - meta["fetched_at"] < self.ttl
+
+    def validators(self, meta: dict) -> dict:
+        """Conditional request headers for a cached response"""
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def body(self, url: str) -> str:
+        with open(self._path(url, ".body"), "rb") as f:
+            return f.read().decode("utf-8", errors="ignore")
+
+    def store(self, url: str, body: bytes, headers):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(url, ".body"), "wb") as f:
+            f.write(body)
+        try:
+            os.remove(self._path(url, ".parsed.json"))
+        except FileNotFoundError:
+            pass
+        self._write_meta(url, {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "size": len(body),
+        })
+        self.evict()
 
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-    pubs = []
-    year_re = re.compile(r"\b(20\d{2}|19\d{2})\b")
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        if len(line) > 20 and not line.lower().startswith(("my profile", "articles", "cited by", "co-authors", "public access")):
+    def revalidated(self, url: str, meta: dict):
+        """Record a 304: the cached body is current again"""
+        meta["fetched_at"] = time.time()
+        self._write_meta(url, meta)
+
+    def touch(self, url: str, meta: dict):
+        self._write_meta(url, meta)
+
+    def parsed(self, url: str, limit=8):
+        try:
+            with open(self._path(url, ".parsed.json"), "r") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return record["items"] if record.get("limit") == limit else None
+
+    def store_parsed(self, url: str, pubs, limit=8):
+        with open(self._path(url, ".parsed.json"), "w") as f:
+            json.dump({"limit": limit, "items": pubs}, f, ensure_ascii=False)
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".meta.json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "r") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            entries.append((meta.get("used_at", 0), meta.get("size", 0), meta["url"]))
+        total = sum(size for _, size, _ in entries)
+        for _, size, url in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for suffix in (".meta.json", ".body", ".parsed.json"):
+                try:
+                    os.remove(self._path(url, suffix))
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+
+def fetch_cached(url: str, cache: HttpCache):
+    """Fetch through the cache.
+
+    Returns (status, text): status is "fresh" when the TTL had not expired
+    (no request made), "not-modified" after a 304, or "fetched" for a new
+    body. text is only set for "fetched"; otherwise read it from the cache.
+    """
+    meta = cache.meta(url)
+    if meta and cache.is_fresh(meta):
+        cache.touch(url, meta)
+        return "fresh", None
+    headers = dict(HEADERS)
+    if meta:
+        headers.update(cache.validators(meta))
+    try:
+        body, resp_headers = _request(url, headers)
+    except HTTPError as e:
+        if e.code == 304 and meta:
+            cache.revalidated(url, meta)
+            return "not-modified", None
+        raise
+    text = body.decode("utf-8", errors="ignore")
+    # Never cache the bot-protection page
+    if is_bot_page(text):
+        raise BotProtectionError(url)
+    cache.store(url, body, resp_headers)
+    return "fetched", text
+
+
+def load_publications(url: str, cache: HttpCache, limit=8):
+    """Fetched and parsed publications, reusing the cached parse when unchanged"""
+    status, text = fetch_cached(url, cache)
+    if text is None:
+        pubs = cache.parsed(url, limit)
+        if pubs is not None:
+            return pubs
+        text = cache.body(url)
+    pubs = parse_publications(text, limit)
+    cache.store_parsed(url, pubs, limit)
+    return pubs
+
+
+def _stripped_lines(lines):
+    """Non-empty stripped lines; yields None and stops on a bot-protection page"""
+    for raw in lines:
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8", errors="ignore")
+        lower = raw.lower()
+        if any(marker in lower for marker in BOT_MARKERS):
+            yield None
+            return
+        for part in raw.splitlines():
+            part = part.strip()
+            if part:
+                yield part
+
+
+def iter_publications(lines, limit=8):
+    """Yield publications from an iterable of profile lines as soon as each is known.
+
+    A candidate title is complete once its three metadata lines have been
+    read, so at most four lines are buffered. Reading stops after `limit`
+    publications (None reads everything). Unlike parse_publications, a bot-protection marker only
+    stops the stream from that line on.
+    """
+    source = _stripped_lines(lines)
+    window = collections.deque()
+    seen = set()
+    count = 0
+    while limit is None or count < limit:
+        # The candidate title plus its metadata lines
+        while len(window) < 4:
+            line = next(source, "")
+            if line is None:
+                return
+            if not line:
+                break
+            window.append(line)
+        if not window:
+            return
+        line = window[0]
+        if len(line) > 20 and not line.lower().startswith(SKIP_PREFIXES):
             title = line
             authors = ""
             venue = ""
             year = None
-            for j in range(1, 4):
-                if i + j >= len(lines):
-                    break
-                meta = lines[i + j]
-                if not year and year_re.search(meta):
-                    year = year_re.search(meta).group(1)
+            for meta in list(window)[1:4]:
+                if not year and YEAR_RE.search(meta):
+                    year = YEAR_RE.search(meta).group(1)
                 if ("," in meta and len(meta) < 200) or (" - " in meta and len(meta) < 200):
                     if not authors:
                         authors = meta
                     elif not venue and " - " in meta:
                         venue = meta
-            pubs.append({
+            for _ in range(min(3, len(window))):
+                window.popleft()
+            t = title.lower()
+            if t in seen:
+                continue
+            seen.add(t)
+            if len(title) < 25 or title.startswith("URL Source:"):
+                continue
+            count += 1
+            yield {
                 "title": title,
                 "authors": authors,
                 "venue": venue,
                 "year": year
-            })
-            i += 3
+            }
         else:
-            i += 1
+            window.popleft()
+
+
+def parse_publications(text: str, limit=8):
+    # Detect bot-protection pages and bail out
+    if is_bot_page(text):
+        return []
+    return list(iter_publications(text.splitlines(), limit))
+
+
+def _checked_lines(lines, url):
+    for line in lines:
+        if is_bot_page(line.decode("utf-8", errors="ignore")):
+            raise BotProtectionError(url)
+        yield line
+
+
+def stream_publications(url: str, limit=8):
+    """Parse the profile while it downloads, closing the connection at `limit`"""
+    resp = with_retries(lambda: urlopen(Request(url, headers=HEADERS), timeout=REQUEST_TIMEOUT))
+    with resp:
+        yield from iter_publications(_checked_lines(resp, url), limit)
+
+
+class HostLimiter:
+    """Bounds concurrent requests per host and spaces out their start times"""
+
+    def __init__(self, concurrency: int = HOST_CONCURRENCY, min_interval: float = HOST_MIN_INTERVAL):
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.slots = {}
+        self.next_start = {}
+
+    def acquire(self, url: str):
+        host = urlsplit(url).netloc
+        with self.lock:
+            slot = self.slots.setdefault(host, threading.BoundedSemaphore(self.concurrency))
+        slot.acquire()
+        with self.lock:
+            start = max(time.monotonic(), self.next_start.get(host, 0))
+            self.next_start[host] = start + self.min_interval
+        time.sleep(max(0, start - time.monotonic()))
+        return slot
+
+
+def page_url(url: str, start: int, page_size: int = PAGE_SIZE) -> str:
+    return f"{url}&cstart={start}&pagesize={page_size}"
+
+
+def fetch_page(url: str, limiter: HostLimiter, cache=None):
+    """All publications on one profile page"""
+    slot = limiter.acquire(url)
+    try:
+        if cache is not None:
+            return load_publications(url, cache, limit=None)
+        return parse_publications(fetch_text(url), limit=None)
+    finally:
+        slot.release()
+
+
+def fetch_all_publications(url: str, cache=None, page_size: int = PAGE_SIZE,
+                           concurrency: int = HOST_CONCURRENCY, max_pages: int = MAX_PAGES):
+    """Every publication on the profile, walking its pages concurrently.
+
+    Pages are requested in waves of `concurrency`; the walk ends at the
+    first page that is empty or adds no new title. A short page is not
+    the end: the parser drops short and duplicate titles, so a full page
+    can parse to fewer than `page_size` entries. Results are merged in
+    page order and deduplicated by title.
+    """
+    limiter = HostLimiter(concurrency)
     seen = set()
-    cleaned = []
-    for p in pubs:
-        t = p["title"].lower()
-        if t in seen:
-            continue
-        seen.add(t)
-        if len(p["title"]) < 25:
-            continue
-        if p["title"].startswith("URL Source:"):
-            continue
-        cleaned.append(p)
-    return cleaned[:8]
+    merged = []
+    fetched = 0
+    done = False
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while not done and fetched < max_pages:
+            starts = [(fetched + k) * page_size for k in range(min(concurrency, max_pages - fetched))]
+            wave = list(pool.map(lambda start: fetch_page(page_url(url, start, page_size), limiter, cache), starts))
+            fetched += len(wave)
+            for page in wave:
+                new = []
+                for pub in page:
+                    t = pub["title"].lower()
+                    if t not in seen:
+                        seen.add(t)
+                        new.append(pub)
+                if not new:
+                    done = True
+                    break
+                merged.extend(new)
+    if not done:
+        print(f"Stopped after {max_pages} pages ({len(merged)} publications); "
+              f"the profile may have more", file=sys.stderr)
+    return merged
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Fetch publications from Google Scholar as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="always download and parse the profile")
+    parser.add_argument("--stream", action="store_true",
+                        help="parse while downloading and stop once enough publications are found")
+    parser.add_argument("--all", action="store_true",
+                        help="fetch every page of the profile instead of the first 8 publications")
+    parser.add_argument("--ttl", type=float, default=CACHE_TTL,
+                        help="seconds a cached response is used without revalidating")
+    parser.add_argument("-o", "--output",
+                        help=f"write to this file (e.g. {PUBS_PATH}) only when the fetch succeeds")
+    args = parser.parse_args()
+
+    def fetch():
+        if args.all:
+            return fetch_all_publications(PROFILE_URL, None if args.no_cache else HttpCache(ttl=args.ttl))
+        if args.stream:
+            return list(stream_publications(PROFILE_URL))
+        if args.no_cache:
+            return parse_publications(fetch_text(PROFILE_URL))
+        return load_publications(PROFILE_URL, HttpCache(ttl=args.ttl))
+
     try:
-        text = fetch_text(PROFILE_URL)
+        pubs = fetch_resilient(fetch, CircuitBreaker())
     except Exception as e:
         print(f"Error fetching profile: {e}", file=sys.stderr)
-        sys.exit(1)
-    pubs = parse_publications(text)
-    out = {
-        "source": "google_scholar",
-        "profile": "https://scholar.google.com/citations?user=jgle1SAAAAAJ&hl=en",
-        "count": len(pubs),
-        "items": pubs
-    }
-    print(json.dumps(out, ensure_ascii=False, indent=2))
+        if args.output:
+            # Leave the last good file in place
+            print(f"Keeping {args.output} unchanged", file=sys.stderr)
+            return
+        out = load_last_good()
+        if out is None:
+            sys.exit(1)
+        print("Falling back to the last good publication list", file=sys.stderr)
+    else:
+        out = {
+            "source": "google_scholar",
+            "profile": "https://scholar.google.com/citations?user=jgle1SAAAAAJ&hl=en",
+            "count": len(pubs),
+            "items": pubs
+        }
+        write_json(LAST_GOOD_PATH, out)
+    if args.output:
+        write_json(args.output, out)
+    else:
+        print(json.dumps(out, ensure_ascii=False, indent=2))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+import os
+import re
+import sys
+
+from media import EVEN_SIZE, FFMPEG, MEDIA_DIR, cached_outputs, install, media_url
+from site_build import SITE_DIR, format_attrs, local_file, parse_attrs, rewrite_pages, sub_outside_comments
+
+IMG_RE = re.compile(r'<img\b[^>]*?/?>', re.IGNORECASE | re.DOTALL)
+
+# Attributes carried over from the <img> to the <video>
+KEPT_ATTRS = ('id', 'class', 'style', 'width', 'height', 'title')
+
+GIF_OUTPUTS = {
+    '.webm': ['-an', '-vf', EVEN_SIZE, '-c:v', 'libvpx-vp9', '-b:v', '0', '-crf', '40',
+              '-row-mt', '1', '-cpu-used', '4'],
+    '.mp4': ['-an', '-vf', EVEN_SIZE, '-c:v', 'libx264', '-pix_fmt', 'yuv420p',
+             '-crf', '28', '-movflags', '+faststart'],
+    '-poster.jpg': ['-frames:v', '1', '-q:v', '4'],
+}
+
+def gif_to_video(tag, page_dir, site_dir):
+    """Replace an animated GIF <img> with a muted, looping, autoplaying <video>"""
+    attrs = parse_attrs(tag)
+    path = local_file(attrs.get('src'), page_dir)
+    if not path or not path.lower().endswith('.gif'):
+        return tag
+    names = cached_outputs(path, GIF_OUTPUTS)
+    install(names.values(), site_dir)
+
+    video = {k: attrs[k] for k in KEPT_ATTRS if k in attrs}
+    if attrs.get('alt'):
+        video['aria-label'] = attrs['alt']
+    video['poster'] = media_url(names['-poster.jpg'], page_dir, site_dir)
+    # Smallest encoding first; browsers take the first type they can play
+    sources = sorted([('.webm', 'video/webm'), ('.mp4', 'video/mp4')],
+                     key=lambda s: os.path.getsize(os.path.join(site_dir, MEDIA_DIR, names[s[0]])))
+    return (
+        f'<video autoplay loop muted playsinline{format_attrs(video)}>'
+        + ''.join(f'<source src="{media_url(names[suffix], page_dir, site_dir)}" type="{mime}">'
+                  for suffix, mime in sources)
+        + '</video>'
+    )
+
+def run(site_dir):
+    """Swap every GIF <img> in the site tree for its video equivalent"""
+    if FFMPEG is None:
+        print("ffmpeg not found; skipping GIF to video conversion", file=sys.stderr)
+        return
+
+    def transform(html, filepath):
+        page_dir = os.path.dirname(filepath)
+        return sub_outside_comments(IMG_RE, lambda m: gif_to_video(m.group(0), page_dir, site_dir), html)
+
+    rewrite_pages(site_dir, transform)
+
+def main():
+    run(sys.argv[1] if len(sys.argv) > 1 else SITE_DIR)
+
+if __name__ == "__main__":
+    main()
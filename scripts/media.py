@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+import os
+import re
+import shutil
+import subprocess
+
+from build_cache import CACHE_DIR, hash_file
+
+# ffmpeg is optional; media stages are skipped when it is not on PATH
+FFMPEG = shutil.which('ffmpeg')
+
+CACHE_MEDIA = os.path.join(CACHE_DIR, 'media')
+MEDIA_DIR = os.path.join('assets', 'media')
+
+# Even dimensions, required by yuv420p encoders
+EVEN_SIZE = 'scale=trunc(iw/2)*2:trunc(ih/2)*2'
+
+def ffmpeg(*args):
+    subprocess.run([FFMPEG, '-hide_banner', '-loglevel', 'error', '-y', *args], check=True)
+
+def probe_size(src):
+    """(width, height) of the first video stream, or None if unknown"""
+    result = subprocess.run([FFMPEG, '-hide_banner', '-i', src], capture_output=True, text=True)
+    match = re.search(r'Video: .*?(\d{2,5})x(\d{2,5})', result.stderr)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+def cached_outputs(src, outputs):
+    """Encode src once per content hash.
+
+    outputs maps a filename suffix (e.g. '.mp4' or '-360.webm') to the
+    ffmpeg output options producing it. Files are named after the source
+    stem and hash, so an unchanged input is never re-encoded. Returns the
+    generated file names in the same order.
+    """
+    digest = hash_file(src)
+    stem = os.path.splitext(os.path.basename(src))[0]
+    os.makedirs(CACHE_MEDIA, exist_ok=True)
+    names = {}
+    for suffix, options in outputs.items():
+        name = f"{stem}-{digest[:8]}{suffix}"
+        path = os.path.join(CACHE_MEDIA, name)
+        if not os.path.exists(path):
+            partial = os.path.join(CACHE_MEDIA, f".partial-{name}")
+            ffmpeg('-i', src, *options, partial)
+            os.replace(partial, path)
+            print(f"Encoded: {path}")
+        names[suffix] = name
+    return names
+
+def install(names, site_dir):
+    """Copy cached media files into the site tree"""
+    target_dir = os.path.join(site_dir, MEDIA_DIR)
+    os.makedirs(target_dir, exist_ok=True)
+    for name in names:
+        target = os.path.join(target_dir, name)
+        if not os.path.exists(target):
+            shutil.copyfile(os.path.join(CACHE_MEDIA, name), target)
+
+def media_url(name, page_dir, site_dir):
+    path = os.path.join(site_dir, MEDIA_DIR, name)
+    return os.path.relpath(path, page_dir).replace(os.sep, '/')
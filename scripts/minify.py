@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+import glob
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from build_cache import CACHE_DIR, OutputWriter, hash_file, hash_text
+from postprocess import PARALLEL_THRESHOLD, Token, iter_tokens
+from site_build import SITE_DIR
+
+CACHE_MINIFIED = os.path.join(CACHE_DIR, 'minify')
+
+# Content kept byte for byte, including the markup nested inside it
+PRESERVE = ('pre', 'textarea')
+
+# Elements that never render whitespace next to them, so the whitespace
+# between two of these tags can be dropped rather than collapsed
+BLOCK_TAGS = {
+    'html', 'head', 'body', 'title', 'meta', 'link', 'style', 'script', 'noscript', 'base',
+    'div', 'section', 'article', 'aside', 'header', 'footer', 'nav', 'main', 'p', 'ul', 'ol',
+    'li', 'dl', 'dt', 'dd', 'table', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th', 'figure',
+    'figcaption', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'br', 'form', 'fieldset',
+    'picture', 'source', 'video', 'audio', 'blockquote', 'details', 'summary', 'option',
+}
+
+# MathJax delimiters ($$..$$, \[..\], $..$, \(..\)); whitespace inside is left alone
+TEX_RE = re.compile(r'\$\$.*?\$\$|\\\[.*?\\\]|\$[^$\n]+?\$|\\\(.*?\\\)', re.DOTALL)
+SPACE_RE = re.compile(r'\s+')
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_STRING_RE = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''')
+CSS_PUNCT_RE = re.compile(r'\s*([{};,>])\s*')
+CSS_COLON_RE = re.compile(r':\s+')
+
+def minify_css(css):
+    """Drop comments and insignificant whitespace from a stylesheet, keeping strings intact"""
+    parts = CSS_STRING_RE.split(CSS_COMMENT_RE.sub('', css))
+    for i in range(0, len(parts), 2):
+        # Only the space after ':' is removed; before it, "a :hover" and
+        # "a:hover" are different selectors
+        text = SPACE_RE.sub(' ', parts[i])
+        text = CSS_COLON_RE.sub(':', CSS_PUNCT_RE.sub(r'\1', text))
+        parts[i] = text.replace(';}', '}')
+    return ''.join(parts).strip()
+
+def minify_script(js):
+    """Trim indentation and blank lines; line breaks stay for automatic semicolon insertion.
+
+    Scripts with template literals or lines continued by a trailing
+    backslash are returned unchanged since their whitespace may be
+    content.
+    """
+    if '`' in js or any(line.rstrip().endswith('\\') for line in js.splitlines()):
+        return js
+    return '\n'.join(line.strip() for line in js.splitlines() if line.strip())
+
+def _collapse(text):
+    """Collapse whitespace runs in text, leaving TeX regions untouched"""
+    out = []
+    pos = 0
+    for match in TEX_RE.finditer(text):
+        out.append(SPACE_RE.sub(' ', text[pos:match.start()]))
+        out.append(match.group(0))
+        pos = match.end()
+    out.append(SPACE_RE.sub(' ', text[pos:]))
+    return ''.join(out)
+
+def _is_block(token):
+    return token.kind == 'decl' or (token.kind in ('start', 'end') and token.tag in BLOCK_TAGS)
+
+def minify_html(html):
+    """Strip comments and insignificant whitespace; <pre>, <textarea> and TeX are kept verbatim"""
+    tokens = []
+    for token in iter_tokens(html):
+        if token.kind == 'comment' and not token.raw.startswith('<!--[if'):
+            continue
+        if token.kind == 'text' and tokens and tokens[-1].kind == 'text':
+            # Text on both sides of a dropped comment
+            tokens[-1] = Token('text', tokens[-1].raw + token.raw)
+            continue
+        tokens.append(token)
+    out = []
+    preserve = 0
+    raw_parent = None
+    for i, token in enumerate(tokens):
+        if token.kind == 'start' and token.tag in PRESERVE:
+            preserve += 1
+        elif token.kind == 'end' and token.tag in PRESERVE and preserve:
+            preserve -= 1
+        elif token.kind == 'text' and not preserve:
+            if raw_parent == 'style':
+                token_raw = minify_css(token.raw)
+            elif raw_parent == 'script':
+                token_raw = minify_script(token.raw)
+            elif token.raw.isspace():
+                before = tokens[i - 1] if i else None
+                after = tokens[i + 1] if i + 1 < len(tokens) else None
+                token_raw = '' if before is None or after is None or (_is_block(before) and _is_block(after)) \
+                    else ' '
+            else:
+                token_raw = _collapse(token.raw)
+            out.append(token_raw)
+            continue
+        raw_parent = token.tag if token.kind == 'start' else None
+        out.append(token.raw)
+    return ''.join(out)
+
+def minified(filepath, source_hash):
+    """Minified content of filepath, reused from the cache when the input hash was seen before"""
+    with open(filepath, 'r') as f:
+        html = f.read()
+    digest = hash_text(source_hash + html)
+    cached = os.path.join(CACHE_MINIFIED, digest + '.html')
+    try:
+        with open(cached, 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    result = minify_html(html)
+    os.makedirs(CACHE_MINIFIED, exist_ok=True)
+    OutputWriter().write(cached, result)
+    return result
+
+def _minify_page(args):
+    filepath, source_hash = args
+    return OutputWriter().write(filepath, minified(filepath, source_hash))
+
+def run(site_dir, jobs=0):
+    """Minify every page of the site tree, in parallel for large sites"""
+    pages = sorted(glob.glob(os.path.join(site_dir, '**', '*.html'), recursive=True))
+    # A change to the minifier itself invalidates the cached results
+    source_hash = hash_file(__file__)
+    work = [(p, source_hash) for p in pages]
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1 or len(pages) < PARALLEL_THRESHOLD:
+        changed = [_minify_page(w) for w in work]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            changed = list(pool.map(_minify_page, work, chunksize=max(1, len(work) // (jobs * 4))))
+    print(f"Minified {sum(changed)} of {len(pages)} page(s)")
+
+def main():
+    run(sys.argv[1] if len(sys.argv) > 1 else SITE_DIR)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+import fnmatch
+import glob
+import importlib
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from build_cache import OutputWriter
+from profiling import count, span
+from site_build import SITE_DIR
+
+# Modules that register transforms when imported
+TRANSFORM_MODULES = [
+    'add_logos_to_projects',
+]
+
+# Below this many pages a process pool costs more than it saves
+PARALLEL_THRESHOLD = 32
+
+TOKEN_RE = re.compile(
+    r'<!--.*?-->'                                # comment
+    r'|<![^>]*>|<\?[^>]*>'                       # doctype / processing instruction
+    r'|</[a-zA-Z][\w:-]*\s*>'                    # end tag
+    r'|<[a-zA-Z][\w:-]*(?:"[^"]*"|\'[^\']*\'|[^\'">])*>',  # start tag
+    re.DOTALL,
+)
+TAG_NAME_RE = re.compile(r'</?([a-zA-Z][\w:-]*)')
+# Elements whose content is not markup
+RAW_TEXT = ('script', 'style', 'textarea', 'title')
+
+class Token:
+    """One piece of an HTML document; joining every token's raw text restores it exactly"""
+
+    __slots__ = ('kind', 'raw', 'tag')
+
+    def __init__(self, kind, raw, tag=None):
+        self.kind = kind
+        self.raw = raw
+        self.tag = tag
+
+    def __repr__(self):
+        return f"Token({self.kind!r}, {self.raw!r})"
+
+def iter_tokens(html):
+    """Yield text, start, end, comment and decl tokens of html in document order"""
+    pos = 0
+    length = len(html)
+    while pos < length:
+        match = TOKEN_RE.search(html, pos)
+        if not match:
+            yield Token('text', html[pos:])
+            return
+        if match.start() > pos:
+            yield Token('text', html[pos:match.start()])
+        raw = match.group(0)
+        pos = match.end()
+        if raw.startswith('<!--'):
+            yield Token('comment', raw)
+        elif raw.startswith(('<!', '<?')):
+            yield Token('decl', raw)
+        elif raw.startswith('</'):
+            yield Token('end', raw, TAG_NAME_RE.match(raw).group(1).lower())
+        else:
+            tag = TAG_NAME_RE.match(raw).group(1).lower()
+            yield Token('start', raw, tag)
+            if tag in RAW_TEXT and not raw.endswith('/>'):
+                close = re.compile(rf'</{tag}\s*>', re.IGNORECASE).search(html, pos)
+                end = close.start() if close else length
+                if end > pos:
+                    yield Token('text', html[pos:end])
+                pos = end
+
+class Page:
+    """What a transform knows about the document it is rewriting"""
+
+    def __init__(self, filepath, root):
+        self.filepath = filepath
+        self.root = root
+        self.dir = os.path.dirname(filepath)
+        self.relpath = os.path.relpath(filepath, root).replace(os.sep, '/')
+
+# name -> (glob patterns relative to the site root, transform function)
+_registry = {}
+
+def register(name, patterns):
+    """Register a transform applied to pages matching any of patterns.
+
+    A transform is a generator function transform(tokens, page) that
+    consumes a token iterator and yields tokens. Transforms are chained in
+    registration order, so a document is tokenized and rewritten in one
+    pass whatever the number of transforms.
+    """
+    def decorator(fn):
+        _registry[name] = (list(patterns), fn)
+        return fn
+    return decorator
+
+def load_transforms():
+    for name in TRANSFORM_MODULES:
+        importlib.import_module(name)
+    return dict(_registry)
+
+def transforms_for(page, names=None):
+    return [fn for name, (patterns, fn) in load_transforms().items()
+            if (names is None or name in names)
+            and any(fnmatch.fnmatch(page.relpath, pattern) for pattern in patterns)]
+
+def process_html(html, page, transforms):
+    tokens = iter_tokens(html)
+    for transform in transforms:
+        tokens = transform(iter(tokens), page)
+    return ''.join(token.raw for token in tokens)
+
+def process_file(filepath, root='.', names=None, writer=None):
+    """Run the matching transforms over one page; returns True if the file changed"""
+    page = Page(filepath, root)
+    transforms = transforms_for(page, names)
+    if not transforms:
+        return False
+    with span('postprocess:page', file=filepath):
+        with open(filepath, 'r') as f:
+            content = f.read()
+        updated = process_html(content, page, transforms)
+        if updated == content:
+            return False
+        written = (writer or OutputWriter()).write(filepath, updated)
+    if written:
+        count('postprocess:pages_changed')
+        print(f"Updated: {filepath}")
+    return written
+
+def _process(args):
+    return process_file(*args)
+
+def discover(root, names=None):
+    """Pages under root matched by the patterns of the selected transforms"""
+    paths = set()
+    for name, (patterns, _) in load_transforms().items():
+        if names is None or name in names:
+            for pattern in patterns:
+                paths.update(p for p in glob.glob(os.path.join(root, pattern)) if os.path.isfile(p))
+    return sorted(paths)
+
+def run(site_dir, names=None, jobs=0):
+    """Post-process every matching page of site_dir, in parallel for large sites"""
+    pages = discover(site_dir, names)
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1 or len(pages) < PARALLEL_THRESHOLD:
+        writer = OutputWriter()
+        changed = [process_file(p, site_dir, names, writer) for p in pages]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            changed = list(pool.map(_process, [(p, site_dir, names) for p in pages],
+                                    chunksize=max(1, len(pages) // (jobs * 4))))
+    print(f"Post-processed {len(pages)} page(s), {sum(changed)} changed")
+
+def main():
+    run(sys.argv[1] if len(sys.argv) > 1 else SITE_DIR)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+import html as htmllib
+import json
+import os
+import re
+import sys
+
+from build_cache import CACHE_DIR, hash_text, replace_file
+from postprocess import iter_tokens
+from site_build import SITE_DIR, rewrite_pages
+
+# latex2mathml is optional; math stays client-side when it is missing
+try:
+    from latex2mathml.converter import convert
+except ImportError:
+    convert = None
+
+MATH_CACHE = os.path.join(CACHE_DIR, 'math.json')
+
+# MathJax 3 defaults, used when a page does not configure its delimiters
+DEFAULT_INLINE = [('\\(', '\\)')]
+DEFAULT_DISPLAY = [('$$', '$$'), ('\\[', '\\]')]
+
+# Elements MathJax does not typeset in (its default skipHtmlTags)
+SKIP_TAGS = ('script', 'noscript', 'style', 'textarea', 'pre', 'code')
+
+DELIMS_RE = re.compile(r'(inlineMath|displayMath)\s*:\s*(\[\s*\[.*?\]\s*\])', re.DOTALL)
+PAIR_RE = re.compile(r'''\[\s*(['"])(.*?)\1\s*,\s*(['"])(.*?)\3\s*\]''')
+SCRIPT_RE = re.compile(r'[ \t]*<script\b([^>]*)>(.*?)</script>\n?', re.DOTALL | re.IGNORECASE)
+# Scripts that only exist to typeset math in the browser
+RUNTIME_SRC_RE = re.compile(r'src="[^"]*(mathjax|polyfill\.io)[^"]*"', re.IGNORECASE)
+RUNTIME_CONFIG_RE = re.compile(r'^\s*(window\.)?MathJax\s*=', re.MULTILINE)
+
+def configured_delimiters(html):
+    """(inline, display) delimiter pairs from the page's MathJax config"""
+    found = {}
+    for name, pairs in DELIMS_RE.findall(html):
+        # Delimiters are read as written in the source, so '\(' means the
+        # TeX \( delimiter the author intended
+        found.setdefault(name, [(o, c) for _, o, _, c in PAIR_RE.findall(pairs)])
+    return found.get('inlineMath', DEFAULT_INLINE), found.get('displayMath', DEFAULT_DISPLAY)
+
+def math_pattern(inline, display):
+    """One regex matching any delimited expression; display delimiters are tried first"""
+    alternatives = []
+    for group, pairs in (('d', display), ('i', inline)):
+        for open_, close in sorted(pairs, key=lambda p: -len(p[0])):
+            alternatives.append(rf'(?<!\\){re.escape(open_)}(?P<{group}{len(alternatives)}>.+?)(?<!\\){re.escape(close)}')
+    return re.compile('|'.join(alternatives), re.DOTALL)
+
+class MathRenderer:
+    """TeX to MathML with results cached by expression hash"""
+
+    def __init__(self, path=MATH_CACHE):
+        self.path = path
+        self.dirty = False
+        try:
+            with open(path, 'r') as f:
+                self.cache = json.load(f)
+        except (OSError, ValueError):
+            self.cache = {}
+
+    def render(self, tex, display):
+        """MathML for tex, or None if it cannot be converted"""
+        key = hash_text(f"{display}:{tex}")
+        if key not in self.cache:
+            try:
+                self.cache[key] = convert(tex, display='block' if display else 'inline')
+            except Exception:
+                # Malformed TeX is left for a human to fix
+                self.cache[key] = None
+            self.dirty = True
+        return self.cache[key]
+
+    def save(self):
+        if self.dirty:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            replace_file(self.path, json.dumps(self.cache, indent=1, sort_keys=True).encode('utf-8'))
+            self.dirty = False
+
+def prerender(html, renderer):
+    """Replace the page's TeX with MathML; drop MathJax if nothing is left to typeset"""
+    inline, display = configured_delimiters(html)
+    pattern = math_pattern(inline, display)
+    failed = 0
+    rendered = 0
+
+    def replace(match):
+        nonlocal failed, rendered
+        group = next(name for name, value in match.groupdict().items() if value is not None)
+        mathml = renderer.render(htmllib.unescape(match.group(group)).strip(), group.startswith('d'))
+        if mathml is None:
+            failed += 1
+            return match.group(0)
+        rendered += 1
+        return mathml
+
+    out = []
+    skip = 0
+    for token in iter_tokens(html):
+        if token.kind == 'start' and token.tag in SKIP_TAGS and not token.raw.endswith('/>'):
+            skip += 1
+        elif token.kind == 'end' and token.tag in SKIP_TAGS and skip:
+            skip -= 1
+        elif token.kind == 'text' and not skip:
+            out.append(pattern.sub(replace, token.raw))
+            continue
+        out.append(token.raw)
+    result = ''.join(out)
+
+    if rendered and not failed:
+        result = SCRIPT_RE.sub(lambda m: '' if RUNTIME_SRC_RE.search(m.group(1))
+                               or RUNTIME_CONFIG_RE.search(m.group(2)) else m.group(0), result)
+    elif failed:
+        print(f"Left {failed} expression(s) for MathJax", file=sys.stderr)
+    return result
+
+def run(site_dir):
+    """Pre-render the math of every page that loads MathJax"""
+    if convert is None:
+        print("latex2mathml is not installed; math is typeset in the browser (pip install latex2mathml)",
+              file=sys.stderr)
+        return
+    renderer = MathRenderer()
+
+    def transform(html, filepath):
+        if 'mathjax' not in html.lower():
+            return html
+        return prerender(html, renderer)
+
+    rewrite_pages(site_dir, transform)
+    renderer.save()
+
+def main():
+    run(sys.argv[1] if len(sys.argv) > 1 else SITE_DIR)
+
+if __name__ == "__main__":
+    main()
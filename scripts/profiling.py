@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+import json
+import os
+import threading
+import time
+
+# Spans and counters are only recorded between enable() and disable(); while
+# disabled, span() hands back a shared no-op context manager and count()
+# returns after one check.
+_profiler = None
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.events.append((self.name, self.start, time.perf_counter_ns() - self.start,
+                                     threading.get_ident(), self.args))
+        return False
+
+
+class Profiler:
+    """Collects completed spans and running counter totals for one process"""
+
+    def __init__(self):
+        self.origin = time.perf_counter_ns()
+        self.events = []
+        self.counters = {}
+        self.samples = []
+
+    def count(self, name, n=1):
+        total = self.counters[name] = self.counters.get(name, 0) + n
+        self.samples.append((name, time.perf_counter_ns(), total))
+
+    def chrome_trace(self):
+        """The recording as Chrome trace-event JSON (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        events = []
+        for name, start, duration, tid, args in self.events:
+            event = {"name": name, "cat": name.split(":", 1)[0], "ph": "X", "pid": pid, "tid": tid,
+                     "ts": (start - self.origin) / 1000, "dur": duration / 1000}
+            if args:
+                event["args"] = args
+            events.append(event)
+        for name, ts, total in self.samples:
+            events.append({"name": name, "ph": "C", "pid": pid, "ts": (ts - self.origin) / 1000,
+                           "args": {name: total}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def summary(self):
+        """Plain-text table of span totals (slowest first) followed by the counters"""
+        totals = {}
+        for name, _, duration, _, _ in self.events:
+            calls, total, longest = totals.get(name, (0, 0, 0))
+            totals[name] = (calls + 1, total + duration, max(longest, duration))
+        lines = [f"{'span':<40} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"]
+        for name, (calls, total, longest) in sorted(totals.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"{name:<40} {calls:>7} {total / 1e6:>10.2f} {total / calls / 1e6:>9.3f} "
+                         f"{longest / 1e6:>9.3f}")
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'counter':<40} {'total':>12}")
+            for name, total in sorted(self.counters.items()):
+                lines.append(f"{name:<40} {total:>12,}")
+        return "\n".join(lines)
+
+
+def enable():
+    """Start recording; returns the active Profiler"""
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def disable():
+    """Stop recording and return what was recorded (None if nothing was)"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+def enabled():
+    return _profiler is not None
+
+
+def span(name, **args):
+    """Context manager timing the enclosed block as `name` when profiling is on"""
+    if _profiler is None:
+        return _NULL_SPAN
+    return _Span(_profiler, name, args)
+
+
+def count(name, n=1):
+    """Add n to counter `name` when profiling is on"""
+    if _profiler is not None:
+        _profiler.count(name, n)
+
+
+def write_chrome_trace(profiler, path):
+    with open(path, "w") as f:
+        json.dump(profiler.chrome_trace(), f)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+import json
+import os
+import re
+import sys
+from urllib.parse import urlsplit
+
+from build_cache import CACHE_DIR, replace_file
+from postprocess import Token, iter_tokens
+from site_build import SITE_DIR, format_attrs, parse_attrs, rewrite_pages
+
+REPORT_PATH = os.path.join(CACHE_DIR, 'resources.json')
+
+# An image is the hero if less visible text than this precedes it
+HERO_TEXT_CHARS = 500
+
+# Origins a third-party resource goes on to fetch from
+FOLLOW_UP_ORIGINS = {
+    'https://fonts.googleapis.com': 'https://fonts.gstatic.com',
+}
+
+# Attributes of subresources the page fetches itself (not navigations)
+RESOURCE_ATTRS = {
+    'script': 'src', 'img': 'src', 'source': 'src', 'video': 'poster',
+    'iframe': 'src', 'audio': 'src', 'link': 'href',
+}
+HINT_RELS = ('preconnect', 'dns-prefetch')
+SPACE_RE = re.compile(r'\s+')
+
+def _origin(url):
+    parts = urlsplit(url if not url.startswith('//') else 'https:' + url)
+    if parts.scheme in ('http', 'https') and parts.netloc:
+        return f"{parts.scheme}://{parts.netloc}"
+    return None
+
+def _resource_key(token, attrs, script_body):
+    """What makes two resource tags duplicates of each other, or None"""
+    if token.tag == 'script':
+        if attrs.get('src'):
+            return 'script', attrs['src']
+        if script_body is not None and script_body.strip():
+            return 'inline-script', SPACE_RE.sub(' ', script_body).strip()
+    if token.tag == 'link' and attrs.get('href'):
+        rel = (attrs.get('rel') or '').lower()
+        if rel in ('stylesheet', 'preload', 'modulepreload', 'icon'):
+            return rel, attrs['href'], attrs.get('media')
+    return None
+
+def optimize(html):
+    """Return (html, changes) with duplicate resources removed and loading hints added"""
+    tokens = list(iter_tokens(html))
+    changes = []
+
+    # Script bodies, so identical inline scripts can be found
+    bodies = {}
+    for i, token in enumerate(tokens):
+        if token.kind == 'start' and token.tag == 'script' and i + 1 < len(tokens):
+            nxt = tokens[i + 1]
+            bodies[i] = nxt.raw if nxt.kind == 'text' else ''
+
+    # Pass 1: drop repeated resources (a script's body and end tag go with it)
+    seen = set()
+    drop = set()
+    for i, token in enumerate(tokens):
+        if token.kind != 'start' or token.tag not in ('script', 'link'):
+            continue
+        attrs = parse_attrs(token.raw)
+        key = _resource_key(token, attrs, bodies.get(i))
+        if key is None:
+            continue
+        if key in seen:
+            end = i
+            if token.tag == 'script':
+                while not (tokens[end].kind == 'end' and tokens[end].tag == 'script'):
+                    end += 1
+            drop.update(range(i, end + 1))
+            # Indentation before the removed tag
+            if i and tokens[i - 1].kind == 'text' and tokens[i - 1].raw.strip() == '':
+                drop.add(i - 1)
+            changes.append(f"removed duplicate {key[0]} {key[1][:60]!r}")
+        seen.add(key)
+    tokens = [t for i, t in enumerate(tokens) if i not in drop]
+
+    # Pass 2: defer blocking scripts no inline script depends on, find the
+    # hero image and the third-party origins
+    last_inline = max((i for i, t in enumerate(tokens) if t.kind == 'start' and t.tag == 'script'
+                       and 'src' not in parse_attrs(t.raw)
+                       and (parse_attrs(t.raw).get('type') or 'text/javascript') in ('text/javascript', 'module')),
+                      default=-1)
+    origins = []
+    existing_hints = set()
+    hero = None
+    hint_at = None
+    in_body = False
+    text_before = 0
+    picture_sources = []
+    for i, token in enumerate(tokens):
+        if token.kind == 'start' and token.tag == 'body':
+            in_body = True
+        if in_body and token.kind == 'text' and not (i and tokens[i - 1].tag in ('script', 'style')):
+            text_before += len(token.raw.strip())
+        if token.kind != 'start':
+            if token.kind == 'end' and token.tag == 'picture':
+                picture_sources = []
+            continue
+        attrs = parse_attrs(token.raw)
+        if not in_body and hint_at is None and token.tag in ('link', 'script', 'style'):
+            hint_at = i
+        if token.tag == 'link' and (attrs.get('rel') or '').lower() in HINT_RELS:
+            existing_hints.add((attrs.get('href') or '').rstrip('/'))
+        elif token.tag in RESOURCE_ATTRS:
+            origin = _origin(attrs.get(RESOURCE_ATTRS[token.tag]) or '')
+            if origin and origin not in origins:
+                origins.append(origin)
+        if token.tag == 'script' and attrs.get('src') and i < last_inline:
+            continue
+        if token.tag == 'script' and attrs.get('src') and not {'async', 'defer'} & attrs.keys() \
+                and attrs.get('type') != 'module':
+            tokens[i] = Token('start', token.raw[:-1].rstrip() + ' defer>', 'script')
+            changes.append(f"deferred script {attrs['src'][:60]!r}")
+        if token.tag == 'source' and attrs.get('srcset'):
+            picture_sources.append(attrs)
+        # An <img> with neither src nor srcset loads nothing to preload
+        if token.tag == 'img' and in_body and hero is None and text_before < HERO_TEXT_CHARS \
+                and (attrs.get('src') or attrs.get('srcset')) and not (attrs.get('src') or '').startswith('data:'):
+            hero = (i, attrs, list(picture_sources))
+
+    # The hero image loads eagerly, at high priority, and is preloaded
+    hints = []
+    if hero:
+        i, attrs, sources = hero
+        if attrs.get('loading') == 'lazy':
+            del attrs['loading']
+        attrs['fetchpriority'] = 'high'
+        raw = f"<img{format_attrs(attrs)}{' /' if tokens[i].raw.endswith('/>') else ''}>"
+        tokens[i] = Token('start', raw, 'img')
+        preload = {'rel': 'preload', 'as': 'image'}
+        if attrs.get('src'):
+            preload['href'] = attrs['src']
+        best = sources[0] if sources else attrs
+        if best.get('srcset'):
+            preload['imagesrcset'] = best['srcset']
+            preload['imagesizes'] = best.get('sizes') or attrs.get('sizes') or '100vw'
+        if best.get('type'):
+            preload['type'] = best['type']
+        preload['fetchpriority'] = 'high'
+        hints.append(f'<link{format_attrs(preload)}>')
+        changes.append(f"preloaded hero image {(attrs.get('src') or attrs['srcset'])[:60]!r}")
+
+    for origin in list(origins):
+        follow = FOLLOW_UP_ORIGINS.get(origin)
+        if follow and follow not in origins:
+            origins.append(follow)
+    preconnects = []
+    for origin in origins:
+        if origin in existing_hints:
+            continue
+        crossorigin = ' crossorigin' if origin in FOLLOW_UP_ORIGINS.values() else ''
+        preconnects.append(f'<link rel="preconnect" href="{origin}"{crossorigin}>')
+        changes.append(f"preconnect {origin}")
+    hints = preconnects + hints
+
+    if hints:
+        if hint_at is None:
+            hint_at = next((i for i, t in enumerate(tokens) if t.kind == 'end' and t.tag == 'head'), None)
+        if hint_at is not None:
+            tokens.insert(hint_at, Token('text', ''.join(h + '\n    ' for h in hints)))
+    return ''.join(t.raw for t in tokens), changes
+
+def run(site_dir):
+    """Optimise resource loading on every page and record what changed"""
+    report = {}
+
+    def transform(html, filepath):
+        updated, changes = optimize(html)
+        if changes:
+            report[os.path.relpath(filepath, site_dir).replace(os.sep, '/')] = changes
+        return updated
+
+    rewrite_pages(site_dir, transform, ['*.html', 'projects/*.html'])
+    for page, changes in sorted(report.items()):
+        print(f"{page}:")
+        for change in changes:
+            print(f"  {change}")
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    replace_file(REPORT_PATH, json.dumps(report, indent=1, sort_keys=True).encode('utf-8'))
+
+def main():
+    run(sys.argv[1] if len(sys.argv) > 1 else SITE_DIR)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+import base64
+import io
+import json
+import os
+import re
+import shutil
+import sys
+
+from build_cache import CACHE_DIR, hash_file, replace_file
+from site_build import SITE_DIR, format_attrs, local_file, parse_attrs, rewrite_pages, sub_outside_comments
+
+# Pillow is optional; WebP/AVIF variants are produced when the installed
+# build has those encoders
+try:
+    from PIL import Image, ImageFilter, features
+except ImportError:
+    Image = None
+
+# Derivatives live in the build cache and are copied into the site tree
+CACHE_IMAGES = os.path.join(CACHE_DIR, 'images')
+MANIFEST = os.path.join(CACHE_DIR, 'images.json')
+DERIVED_DIR = os.path.join('assets', 'derived')
+
+WIDTHS = (160, 320, 640, 960, 1280)
+RASTER_EXTS = ('.jpg', '.jpeg', '.png')
+DEFAULT_SIZES = '(max-width: 840px) 100vw, 800px'
+PLACEHOLDER_WIDTH = 16
+
+IMG_RE = re.compile(r'<img\b[^>]*?/?>', re.IGNORECASE | re.DOTALL)
+
+def available_formats():
+    """Modern formats the local Pillow can encode, best first"""
+    formats = []
+    if features.check('avif'):
+        formats.append('avif')
+    if features.check('webp'):
+        formats.append('webp')
+    return formats
+
+def _placeholder(image):
+    """Tiny blurred JPEG as a data: URI, shown while the real image loads"""
+    small = image.convert('RGB')
+    small.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH * 4))
+    small = small.filter(ImageFilter.GaussianBlur(1))
+    buf = io.BytesIO()
+    small.save(buf, 'JPEG', quality=40)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buf.getvalue()).decode('ascii')
+
+def make_derivatives(src, digest, formats):
+    """Write every width/format variant of src and describe them.
+
+    Variants that are not smaller than the source file are dropped, and
+    a format left with none gets no <source>. The full-size fallback is
+    the source itself when re-encoding does not make it smaller.
+    """
+    os.makedirs(CACHE_IMAGES, exist_ok=True)
+    src_size = os.path.getsize(src)
+    stem = os.path.splitext(os.path.basename(src))[0]
+    fallback = 'jpeg' if src.lower().endswith(('.jpg', '.jpeg')) else 'png'
+    with Image.open(src) as image:
+        image.load()
+        width, height = image.size
+        entry = {'width': width, 'height': height, 'placeholder': _placeholder(image), 'fallback': fallback,
+                 'variants': {}}
+        widths = [w for w in WIDTHS if w < width] + [width]
+        for fmt in formats + [fallback]:
+            ext = 'jpg' if fmt == 'jpeg' else fmt
+            variants = []
+            for w in widths:
+                name = f"{stem}-{digest[:8]}-{w}.{ext}"
+                path = os.path.join(CACHE_IMAGES, name)
+                if not os.path.exists(path):
+                    resized = image if w == width else image.resize((w, round(height * w / width)), Image.LANCZOS)
+                    if fmt == 'jpeg':
+                        resized = resized.convert('RGB')
+                    resized.save(path, fmt.upper(), quality=80, optimize=True)
+                if fmt == fallback and w == width:
+                    if os.path.getsize(path) > src_size:
+                        shutil.copyfile(src, path)
+                elif os.path.getsize(path) >= src_size:
+                    os.remove(path)
+                    continue
+                variants.append([w, name])
+            if variants:
+                entry['variants'][fmt] = variants
+    return entry
+
+def load_manifest():
+    try:
+        with open(MANIFEST, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    replace_file(MANIFEST, json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+
+def derivatives_for(src, site_dir, manifest, formats):
+    """Derivative entry for src, regenerating only when its content hash or the available formats are new"""
+    digest = hash_file(src)
+    key = f"{digest}:{'+'.join(formats)}"
+    entry = manifest.get(key)
+    names = [name for v in (entry or {}).get('variants', {}).values() for _, name in v]
+    if not entry or not all(os.path.exists(os.path.join(CACHE_IMAGES, n)) for n in names):
+        entry = manifest[key] = make_derivatives(src, digest, formats)
+        names = [name for v in entry['variants'].values() for _, name in v]
+        print(f"Derived: {src}")
+    target_dir = os.path.join(site_dir, DERIVED_DIR)
+    os.makedirs(target_dir, exist_ok=True)
+    for name in names:
+        target = os.path.join(target_dir, name)
+        if not os.path.exists(target):
+            shutil.copyfile(os.path.join(CACHE_IMAGES, name), target)
+    return entry
+
+def _url(name, page_dir, site_dir):
+    path = os.path.join(site_dir, DERIVED_DIR, name)
+    return os.path.relpath(path, page_dir).replace(os.sep, '/')
+
+def _srcset(variants, page_dir, site_dir):
+    return ', '.join(f"{_url(name, page_dir, site_dir)} {w}w" for w, name in variants)
+
+def intrinsic_size(attrs, width, height):
+    """width/height attributes to add so the browser can reserve the image's box.
+
+    A pixel width or height the author gave is kept and the other one
+    scaled to match; any other size (e.g. width="100%") gets neither.
+    """
+    given_w, given_h = attrs.get('width'), attrs.get('height')
+    if given_w is None and given_h is None:
+        return {'width': str(width), 'height': str(height)}
+    if (given_w or '').isdigit() and given_h is None:
+        return {'height': str(round(int(given_w) * height / width))}
+    if (given_h or '').isdigit() and given_w is None:
+        return {'width': str(round(int(given_h) * width / height))}
+    return {}
+
+def rewrite_img(tag, page_dir, site_dir, manifest, formats):
+    """Turn one local raster <img> into a <picture> with srcset/sizes"""
+    attrs = parse_attrs(tag)
+    path = local_file(attrs.get('src'), page_dir)
+    if 'srcset' in attrs or not path or not path.lower().endswith(RASTER_EXTS):
+        return tag
+    entry = derivatives_for(path, site_dir, manifest, formats)
+    sizes = attrs.pop('sizes', None) or DEFAULT_SIZES
+    fallback = entry['fallback']
+
+    attrs['src'] = _url(entry['variants'][fallback][-1][1], page_dir, site_dir)
+    attrs['srcset'] = _srcset(entry['variants'][fallback], page_dir, site_dir)
+    attrs['sizes'] = sizes
+    attrs.update(intrinsic_size(attrs, entry['width'], entry['height']))
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    placeholder = f"background-size: cover; background-image: url({entry['placeholder']})"
+    if not (attrs.get('width') or '').isdigit() or not (attrs.get('height') or '').isdigit():
+        # Sized by CSS or a percentage: reserve the space by aspect ratio instead
+        placeholder = f"aspect-ratio: {entry['width']} / {entry['height']}; height: auto; {placeholder}"
+    attrs['style'] = f"{attrs['style'].rstrip('; ')}; {placeholder}" if attrs.get('style') else placeholder
+
+    sources = ''.join(
+        f'<source type="image/{fmt}" srcset="{_srcset(entry["variants"][fmt], page_dir, site_dir)}" sizes="{sizes}">'
+        for fmt in formats if fmt in entry['variants']
+    )
+    img = f'<img{format_attrs(attrs)}>'
+    return f'<picture>{sources}{img}</picture>'
+
+def run(site_dir):
+    """Rewrite the <img> tags of every page in the site tree"""
+    if Image is None:
+        print("Pillow is not installed; skipping responsive images (pip install Pillow)", file=sys.stderr)
+        return
+    formats = available_formats()
+    manifest = load_manifest()
+
+    def transform(html, filepath):
+        page_dir = os.path.dirname(filepath)
+        return sub_outside_comments(
+            IMG_RE, lambda m: rewrite_img(m.group(0), page_dir, site_dir, manifest, formats), html)
+
+    rewrite_pages(site_dir, transform)
+    save_manifest(manifest)
+
+def main():
+    run(sys.argv[1] if len(sys.argv) > 1 else SITE_DIR)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+import glob
+import html as htmllib
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import unicodedata
+from urllib.parse import unquote
+
+from asset_manifest import HASHED_RE
+from build_cache import CACHE_DIR, OutputWriter, hash_file, hash_text, replace_file
+from site_build import SITE_DIR, local_file, parse_attrs
+
+# Text extraction is optional: pdftotext (poppler) is preferred, pypdf is
+# the fallback; without either only pubs.json is indexed
+PDFTOTEXT = shutil.which('pdftotext')
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+PUBS_PATH = os.path.join('assets', 'pubs.json')
+TEXT_CACHE = os.path.join(CACHE_DIR, 'text')
+INDEX_DIR = 'search'
+MANIFEST_NAME = 'manifest.json'
+
+# Shards are sized so a one-word query downloads about this much
+SHARD_TARGET_BYTES = 16 * 1024
+SUMMARY_CHARS = 200
+MAX_TOKEN_CHARS = 30
+
+# (suffix, replacement); the longest suffix leaving MIN_STEM characters
+# wins. Identity rules keep words like "class" or "analysis" from
+# losing their final s. The client stems queries with the same table.
+MIN_STEM = 3
+SUFFIX_RULES = [
+    ('ational', 'ate'), ('ization', 'ize'), ('iveness', 'ive'), ('fulness', 'ful'),
+    ('ousness', 'ous'), ('ations', 'ate'), ('ation', 'ate'), ('ities', ''), ('ity', ''),
+    ('ments', ''), ('ment', ''), ('ness', ''), ('ings', ''), ('ing', ''), ('edly', ''),
+    ('ies', 'y'), ('ied', 'y'), ('ers', ''), ('er', ''), ('ed', ''), ('ly', ''),
+    ('ss', 'ss'), ('us', 'us'), ('is', 'is'), ('s', ''),
+]
+STOPWORDS = frozenset('''
+    a an and are as at be been but by can de des do for from has have in into is it its la le les
+    of on or our that the their these this those to was we were which while with et du en un une
+'''.split())
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+# A word broken across lines by a hyphen, as PDF text extraction leaves it
+HYPHEN_BREAK_RE = re.compile(r'(\w)-\n(\w)')
+ABSTRACT_RE = re.compile(r'\bAbstract\b\s*(.+)', re.DOTALL | re.IGNORECASE)
+HREF_RE = re.compile(r'<a\b[^>]*>', re.IGNORECASE)
+H1_RE = re.compile(r'<h1\b[^>]*>(.*?)</h1>', re.DOTALL | re.IGNORECASE)
+TITLE_RE = re.compile(r'<title>(.*?)</title>', re.DOTALL | re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]+>')
+
+def normalize(text):
+    """Lowercase, accent-free text: the form both tokenizers work on"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+def stem(word):
+    """Strip the longest matching suffix (see SUFFIX_RULES), then a final e"""
+    best = None
+    for suffix, replacement in SUFFIX_RULES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM \
+                and (best is None or len(suffix) > len(best[0])):
+            best = (suffix, replacement)
+    if best and best[0] != best[1]:
+        word = word[:-len(best[0])] + best[1]
+        # running -> runn -> run
+        if not best[1] and len(word) > MIN_STEM and word[-1] == word[-2] and word[-1] not in 'lsz':
+            word = word[:-1]
+    if word.endswith('e') and len(word) > MIN_STEM:
+        word = word[:-1]
+    return word
+
+def tokenize(text):
+    """(term, position) pairs; stopwords keep their position but are not indexed"""
+    for position, word in enumerate(WORD_RE.findall(normalize(text))):
+        if word in STOPWORDS or len(word) > MAX_TOKEN_CHARS or (len(word) == 1 and not word.isdigit()):
+            continue
+        yield stem(word), position
+
+def extract_pdf_text(path):
+    """Plain text of a PDF, cached by content hash; None without an extractor"""
+    if not PDFTOTEXT and PdfReader is None:
+        return None
+    cached = os.path.join(TEXT_CACHE, hash_file(path)[:16] + '.txt')
+    if os.path.exists(cached):
+        with open(cached, 'r', encoding='utf-8') as f:
+            return f.read()
+    if PDFTOTEXT:
+        result = subprocess.run([PDFTOTEXT, '-q', '-enc', 'UTF-8', path, '-'],
+                                capture_output=True, check=True)
+        text = result.stdout.decode('utf-8', errors='replace')
+    else:
+        # pypdf logs a warning for every malformed object it skips
+        logging.getLogger('pypdf').setLevel(logging.ERROR)
+        text = '\n'.join(page.extract_text() or '' for page in PdfReader(path).pages)
+    text = HYPHEN_BREAK_RE.sub(r'\1\2', text)
+    os.makedirs(TEXT_CACHE, exist_ok=True)
+    replace_file(cached, text.encode('utf-8'))
+    print(f"Extracted: {path}")
+    return text
+
+def _plain(fragment):
+    return ' '.join(htmllib.unescape(TAG_RE.sub('', fragment)).split())
+
+def _links(html):
+    return [parse_attrs(tag).get('href') or '' for tag in HREF_RE.findall(html)]
+
+def _title(html):
+    heading = H1_RE.search(html) or TITLE_RE.search(html)
+    return _plain(heading.group(1)) if heading else None
+
+def reachable_pages(site_dir):
+    """{url: html} of the pages a visitor can reach by following links from index.html, in link order.
+
+    Pages nothing links to (placeholders, templates) are left out.
+    """
+    pages = {}
+    queue = [os.path.join(site_dir, 'index.html')]
+    while queue:
+        path = queue.pop(0)
+        url = os.path.relpath(path, site_dir).replace(os.sep, '/')
+        if url in pages or url.startswith('../'):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            pages[url] = f.read()
+        for href in _links(pages[url]):
+            target = local_file(unquote(href.split('#')[0].split('?')[0]), os.path.dirname(path))
+            if target and target.endswith('.html'):
+                queue.append(target)
+    return pages
+
+def linking_page(pages, pdf):
+    """(url, title) of the page for a PDF, preferring a page per paper under projects/.
+
+    A project page named after the PDF (projects/project-emnlp2025.html for
+    assets/emnlp2025.pdf) counts even when it only links to arXiv.
+    """
+    name = os.path.basename(pdf)
+    project = f"project-{os.path.splitext(name)[0]}"
+    for url in sorted(pages, key=lambda url: not url.startswith('projects/')):
+        page = os.path.splitext(os.path.basename(url))[0]
+        named = url.startswith('projects/') and (page == project or page.startswith(project + '-'))
+        if named or any(os.path.basename(href.split('#')[0]) == name for href in _links(pages[url])):
+            return url, _title(pages[url]) or name
+    return None, name
+
+def summary(text):
+    """The opening of the abstract, or of the text"""
+    match = ABSTRACT_RE.search(text)
+    words = (match.group(1) if match else text).split()
+    out = ''
+    for word in words:
+        if len(out) + len(word) >= SUMMARY_CHARS:
+            return out + '…'
+        out = f"{out} {word}" if out else word
+    return out
+
+def collect_documents(site_dir):
+    """Documents to index, as dicts with url, title, meta, summary and text"""
+    docs = []
+    with open(PUBS_PATH, 'r', encoding='utf-8') as f:
+        pubs = json.load(f)
+    pages = reachable_pages(site_dir)
+    # A publication's page is the linked page headed by its title
+    by_title = {}
+    for url in sorted(pages, key=lambda url: not url.startswith('projects/')):
+        by_title.setdefault((_title(pages[url]) or '').casefold(), url)
+    for paper in pubs['items']:
+        meta = f"{paper['authors']} · {paper['venue']} · {paper['year']}"
+        docs.append({
+            'url': by_title.get(_plain(paper['title']).casefold(), 'index.html#publications'),
+            'title': paper['title'],
+            'meta': meta,
+            'summary': '',
+            'text': f"{paper['title']}\n{meta}",
+        })
+    # Content-addressed copies left by earlier deploys are not documents of their own
+    pdfs = sorted(p for p in glob.glob(os.path.join(site_dir, 'assets', '*.pdf'))
+                  if not HASHED_RE.search(os.path.basename(p)))
+    if pdfs and not PDFTOTEXT and PdfReader is None:
+        print("Neither pdftotext nor pypdf is installed; PDFs are not searchable (pip install pypdf)",
+              file=sys.stderr)
+        return docs
+    for pdf in pdfs:
+        text = extract_pdf_text(pdf)
+        url, title = linking_page(pages, pdf)
+        pdf_url = os.path.relpath(pdf, site_dir).replace(os.sep, '/')
+        docs.append({
+            'url': url or pdf_url,
+            'title': title,
+            'meta': f"Full text · {pdf_url}",
+            'summary': summary(text),
+            'text': text,
+        })
+    return docs
+
+def build_index(docs):
+    """term -> [[doc, first position, gap, gap, ...], ...] plus each document's length"""
+    index = {}
+    lengths = []
+    for doc_id, doc in enumerate(docs):
+        positions = {}
+        length = 0
+        for term, position in tokenize(doc['text']):
+            positions.setdefault(term, []).append(position)
+            length += 1
+        lengths.append(length)
+        for term, found in positions.items():
+            # Gaps between positions keep the numbers, and the JSON, short
+            gaps = [found[0]] + [b - a for a, b in zip(found, found[1:])]
+            index.setdefault(term, []).append([doc_id] + gaps)
+    return index, lengths
+
+def shard_of(term, shards):
+    """FNV-1a hash of the term, modulo the shard count (mirrored in search.js)"""
+    h = 0x811c9dc5
+    for byte in term.encode('utf-8'):
+        h = ((h ^ byte) * 0x01000193) & 0xffffffff
+    return h % shards
+
+def shard_count(index):
+    """A power of two giving shards of about SHARD_TARGET_BYTES"""
+    size = len(json.dumps(index, separators=(',', ':')))
+    shards = 1
+    while size / shards > SHARD_TARGET_BYTES:
+        shards *= 2
+    return shards
+
+def write_index(site_dir, docs, index, lengths):
+    """Write the shards and the manifest; shard names carry their content hash"""
+    out_dir = os.path.join(site_dir, INDEX_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    writer = OutputWriter()
+    count = shard_count(index)
+    shards = [{} for _ in range(count)]
+    for term in sorted(index):
+        shards[shard_of(term, count)][term] = index[term]
+    names = []
+    for i, shard in enumerate(shards):
+        content = json.dumps(shard, separators=(',', ':'))
+        names.append(f"{i}.{hash_text(content)[:10]}.json")
+        writer.write(os.path.join(out_dir, names[-1]), content)
+    manifest = {
+        'shards': names,
+        'docs': [[d['url'], d['title'], d['meta'], d['summary']] for d in docs],
+        'lengths': lengths,
+        'rules': SUFFIX_RULES,
+        'min_stem': MIN_STEM,
+        'stopwords': sorted(STOPWORDS),
+        'max_token': MAX_TOKEN_CHARS,
+    }
+    writer.write(os.path.join(out_dir, MANIFEST_NAME),
+                 json.dumps(manifest, ensure_ascii=False, separators=(',', ':')))
+    for stale in glob.glob(os.path.join(out_dir, '*.json')):
+        if os.path.basename(stale) not in names + [MANIFEST_NAME]:
+            os.remove(stale)
+    return count
+
+def run(site_dir):
+    """Index the publications and their PDFs into site_dir/search/"""
+    docs = collect_documents(site_dir)
+    index, lengths = build_index(docs)
+    shards = write_index(site_dir, docs, index, lengths)
+    print(f"Search index: {len(docs)} document(s), {len(index)} term(s) in {shards} shard(s)")
+
+def main():
+    run(sys.argv[1] if len(sys.argv) > 1 else SITE_DIR)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+import argparse
+import ctypes
+import ctypes.util
+import functools
+import glob
+import json
+import os
+import queue
+import select
+import struct
+import subprocess
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from site_build import GENERATORS, PLACEHOLDER_GENERATORS
+from templating import render
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILD_SCRIPT = os.path.join(SCRIPTS_DIR, 'site_build.py')
+
+# (directory, recursive) pairs; the root only for its own pages
+WATCHED = [('scripts', True), ('assets', True), ('templates', True), ('projects', True), ('.', False)]
+PAGES = ['*.html', 'projects/*.html']
+EVENTS_PATH = '/__livereload'
+
+# Editors save in bursts (temp file, rename, chmod); changes arriving
+# this close together are handled as one
+DEBOUNCE = 0.03
+POLL_INTERVAL = 0.2
+KEEPALIVE = 15
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_ISDIR = 0x40000000
+# IN_CREATE only matters for new directories; new files also close after writing
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+def _ignored(name):
+    """Editor swap files, temp files of atomic writes and bytecode"""
+    return name.startswith(('.', '#')) or name.endswith(('~', '.swp', '.tmp', '.pyc')) or name == '__pycache__'
+
+def _walk(directory, recursive):
+    if not recursive:
+        yield directory, [], [f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))]
+        return
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = [d for d in dirnames if not _ignored(d)]
+        yield dirpath, dirnames, filenames
+
+class InotifyWatcher:
+    """Change notifications from the Linux kernel, through libc"""
+
+    def __init__(self, watched):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.dirs = {}
+        for directory, recursive in watched:
+            for dirpath, _, _ in _walk(directory, recursive):
+                self._add(dirpath)
+
+    def _add(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'cannot watch {directory}')
+        self.dirs[wd] = directory
+
+    def _read(self, changed, deleted):
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if wd not in self.dirs or not name or _ignored(name):
+                continue
+            path = os.path.normpath(os.path.join(self.dirs[wd], name))
+            if mask & IN_ISDIR:
+                # New directories in a recursive tree are watched as well
+                if mask & (IN_CREATE | IN_MOVED_TO) and self.dirs[wd] != '.':
+                    self._add(path)
+                continue
+            changed.add(path)
+            if mask & IN_DELETE:
+                deleted.add(path)
+
+    def wait(self):
+        """Block until files change; return their paths.
+
+        Files that vanished without being deleted were temp files an
+        editor (or sed -i) renamed over the real one, and are dropped.
+        """
+        changed = set()
+        while not changed:
+            deleted = set()
+            select.select([self.fd], [], [])
+            self._read(changed, deleted)
+            while select.select([self.fd], [], [], DEBOUNCE)[0]:
+                self._read(changed, deleted)
+            changed = {p for p in changed if p in deleted or os.path.exists(p)}
+        return changed
+
+class PollingWatcher:
+    """Fallback for platforms without inotify: compare mtimes every POLL_INTERVAL"""
+
+    def __init__(self, watched):
+        self.watched = watched
+        self.state = self._scan()
+
+    def _scan(self):
+        state = {}
+        for directory, recursive in self.watched:
+            for dirpath, _, filenames in _walk(directory, recursive):
+                for name in filenames:
+                    if not _ignored(name):
+                        path = os.path.normpath(os.path.join(dirpath, name))
+                        try:
+                            st = os.stat(path)
+                        except FileNotFoundError:
+                            continue
+                        state[path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def wait(self):
+        while True:
+            time.sleep(POLL_INTERVAL)
+            state = self._scan()
+            changed = {p for p in state.keys() | self.state.keys() if state.get(p) != self.state.get(p)}
+            self.state = state
+            if changed:
+                return changed
+
+def make_watcher(watched, poll=False):
+    watched = [(d, r) for d, r in watched if os.path.isdir(d)]
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(watched)
+        except (OSError, AttributeError):
+            print("inotify is unavailable; polling for changes", file=sys.stderr)
+    return PollingWatcher(watched)
+
+def generators_for(changed):
+    """Generator modules to re-run for a set of changed files.
+
+    A generator's own source only re-runs that generator, and placeholder
+    generators are never run. Templates, shared modules and pubs.json
+    re-run every generator, and the build cache then re-renders only the
+    pages whose inputs changed.
+    """
+    generators = set()
+    for path in changed:
+        directory, name = os.path.split(path)
+        module = os.path.splitext(name)[0]
+        if directory == 'scripts' and name.endswith('.py'):
+            if module in GENERATORS:
+                generators.add(module)
+            elif module not in PLACEHOLDER_GENERATORS:
+                return list(GENERATORS)
+        elif directory == 'templates' or path == os.path.join('assets', 'pubs.json'):
+            return list(GENERATORS)
+    return [g for g in GENERATORS if g in generators]
+
+def page_mtimes():
+    return {p: os.stat(p).st_mtime_ns for pattern in PAGES for p in glob.glob(pattern)}
+
+class LiveReload:
+    """Fan-out of change events to every open page's event stream"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients = []
+
+    def subscribe(self):
+        q = queue.Queue()
+        with self.lock:
+            self.clients.append(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            self.clients.remove(q)
+
+    def send(self, change):
+        message = json.dumps(change)
+        with self.lock:
+            for q in self.clients:
+                q.put(message)
+
+class DevHandler(SimpleHTTPRequestHandler):
+    """Static files with no caching, pages with the live reload client"""
+
+    livereload = None
+
+    def end_headers(self):
+        self.send_header('Cache-Control', 'no-store')
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split('?')[0].split('#')[0]
+        if path == EVENTS_PATH:
+            return self.stream_events()
+        filepath = self.translate_path(self.path)
+        if os.path.isdir(filepath):
+            filepath = os.path.join(filepath, 'index.html')
+        if filepath.endswith('.html') and os.path.isfile(filepath):
+            return self.send_page(filepath)
+        return super().do_GET()
+
+    def send_page(self, filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            html = f.read()
+        snippet = f"<script>{render('livereload.js')}</script>"
+        at = html.rfind('</body>')
+        html = html[:at] + snippet + html[at:] if at != -1 else html + snippet
+        body = html.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_events(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        q = self.livereload.subscribe()
+        try:
+            while True:
+                try:
+                    self.wfile.write(f"data: {q.get(timeout=KEEPALIVE)}\n\n".encode('utf-8'))
+                except queue.Empty:
+                    self.wfile.write(b': keepalive\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.livereload.unsubscribe(q)
+
+def rebuild(changed, known_pages):
+    """Re-run the affected generators; return the change event for the browsers and the new page mtimes"""
+    generators = generators_for(changed)
+    if generators:
+        result = subprocess.run([sys.executable, BUILD_SCRIPT, '--no-publish', *generators])
+        if result.returncode != 0:
+            print("Build failed; browsers were not reloaded", file=sys.stderr)
+            return None, known_pages
+    pages = page_mtimes()
+    reload = sorted(p.replace(os.sep, '/') for p in pages.keys() | known_pages.keys()
+                    if pages.get(p) != known_pages.get(p))
+    css = sorted(p.replace(os.sep, '/') for p in changed if p.startswith('assets') and p.endswith('.css'))
+    assets = [p for p in changed if p.startswith('assets') and not p.endswith(('.css', 'pubs.json'))]
+    change = {'reload': '*' if assets else reload, 'css': css}
+    return (change if assets or reload or css else None), pages
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the site, rebuild on change and live-reload open pages")
+    parser.add_argument('-p', '--port', type=int, default=8000)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--poll', action='store_true', help="poll for changes instead of using inotify")
+    args = parser.parse_args()
+
+    livereload = LiveReload()
+    DevHandler.livereload = livereload
+    server = ThreadingHTTPServer((args.host, args.port), functools.partial(DevHandler, directory='.'))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    watcher = make_watcher(WATCHED, args.poll)
+    print(f"Serving on http://{args.host}:{args.port}/ ({type(watcher).__name__})")
+
+    known_pages = page_mtimes()
+    try:
+        while True:
+            changed = watcher.wait()
+            start = time.perf_counter()
+            change, known_pages = rebuild(changed, known_pages)
+            if change:
+                livereload.send(change)
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"{', '.join(sorted(changed))}: reloaded {change['reload'] or 'no pages'}"
+                      f"{', swapped ' + ', '.join(change['css']) if change['css'] else ''} in {elapsed:.0f} ms")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+import glob
+import json
+import os
+import re
+import sys
+from urllib.parse import unquote
+
+from build_cache import OutputWriter, hash_file
+from search_index import INDEX_DIR, MANIFEST_NAME as SEARCH_MANIFEST
+from site_build import SITE_DIR, SITE_PAGES, local_file, rewrite_pages
+from templating import render
+
+SW_NAME = 'sw.js'
+
+# Files up to this size are downloaded when the worker installs
+PRECACHE_MAX_BYTES = 1024 * 1024
+# Larger files are cached on first use, up to a limit per kind; anything
+# bigger always goes to the network
+RUNTIME_MAX_BYTES = {
+    '.pdf': 5 * 1024 * 1024,
+    '.mp4': 20 * 1024 * 1024,
+    '.webm': 20 * 1024 * 1024,
+}
+DEFAULT_RUNTIME_MAX_BYTES = 2 * 1024 * 1024
+
+REF_RE = re.compile(r'''\b(?:href|src|poster)\s*=\s*["']([^"']+)["']''', re.IGNORECASE)
+SRCSET_RE = re.compile(r'''\b(?:srcset|imagesrcset)\s*=\s*["']([^"']+)["']''', re.IGNORECASE)
+CSS_URL_RE = re.compile(r'''url\(\s*["']?([^"')]+)["']?\s*\)''')
+# A <picture>, or a tag with a srcset: browsers fetch one of the images
+# it names, so none of them is precached
+ALTERNATIVES_RE = re.compile(r'<picture\b.*?</picture>|<[a-z]+\b[^>]*\b(?:srcset|imagesrcset)\s*=[^>]*>',
+                             re.IGNORECASE | re.DOTALL)
+
+REGISTER = ('<script>if("serviceWorker"in navigator)addEventListener("load",function(){'
+            'navigator.serviceWorker.register("%s")})</script>')
+
+def _refs(text, is_css):
+    """(reference, is_alternative) pairs of an HTML page or stylesheet"""
+    if is_css:
+        return [(ref, False) for ref in CSS_URL_RE.findall(text)]
+    refs = []
+    fragments = [(ALTERNATIVES_RE.sub(' ', text), False)] + [(m, True) for m in ALTERNATIVES_RE.findall(text)]
+    for fragment, alternative in fragments:
+        refs.extend((ref, alternative) for ref in REF_RE.findall(fragment))
+        for srcset in SRCSET_RE.findall(fragment):
+            refs.extend((candidate.split()[0], True) for candidate in srcset.split(',') if candidate.strip())
+    return refs
+
+def referenced_files(site_dir, pages):
+    """Local files reachable from the pages, mapped to whether they are only responsive-image alternatives"""
+    found = {}
+    queue = [(page, False) for page in pages]
+    while queue:
+        path, alternative = queue.pop()
+        if path in found and (found[path] is False or alternative):
+            continue
+        found[path] = alternative
+        if not path.endswith(('.html', '.css')):
+            continue
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        for ref, srcset in _refs(text, path.endswith('.css')):
+            if ref.startswith('data:'):
+                continue
+            target = local_file(unquote(ref.split('#')[0].split('?')[0]), os.path.dirname(path))
+            if target and os.path.abspath(target).startswith(os.path.abspath(site_dir)):
+                queue.append((target, srcset))
+    return found
+
+def cache_entries(site_dir, files):
+    """[url, revision, mode] for each file, by size and use; files too large to cache are left out.
+
+    Responsive-image alternatives (srcset candidates and the fallback
+    <img> of a <picture>) and search shards are cached at runtime, since
+    a browser fetches just some of them.
+    """
+    entries = []
+    for path, alternative in sorted(files.items()):
+        size = os.path.getsize(path)
+        ext = os.path.splitext(path)[1].lower()
+        if size <= PRECACHE_MAX_BYTES and ext not in ('.mp4', '.webm') and not alternative:
+            mode = 'precache'
+        elif size <= RUNTIME_MAX_BYTES.get(ext, DEFAULT_RUNTIME_MAX_BYTES):
+            mode = 'runtime'
+        else:
+            continue
+        url = os.path.relpath(path, site_dir).replace(os.sep, '/')
+        entries.append([url, hash_file(path)[:12], mode])
+    return entries
+
+def search_files(site_dir):
+    """The search manifest (precached) and its shards (cached at runtime), if the site has an index"""
+    manifest = os.path.join(site_dir, INDEX_DIR, SEARCH_MANIFEST)
+    try:
+        with open(manifest, 'r') as f:
+            shards = json.load(f)['shards']
+    except (OSError, ValueError, KeyError):
+        return {}
+    files = {os.path.join(site_dir, INDEX_DIR, name): True for name in shards}
+    files[manifest] = False
+    return files
+
+def register_worker(html, filepath, site_dir):
+    """Add the registration snippet before </body> (or </html>, or at the end) if the page lacks it"""
+    href = os.path.relpath(os.path.join(site_dir, SW_NAME), os.path.dirname(filepath)).replace(os.sep, '/')
+    snippet = REGISTER % href
+    if snippet in html:
+        return html
+    for end in ('</body>', '</html>'):
+        at = html.rfind(end)
+        if at != -1:
+            return html[:at] + snippet + html[at:]
+    return html + snippet
+
+def run(site_dir):
+    """Write sw.js with a content-hashed cache manifest of the site"""
+    rewrite_pages(site_dir, lambda html, filepath: register_worker(html, filepath, site_dir))
+    pages = [p for pattern in SITE_PAGES
+             for p in sorted(glob.glob(os.path.join(site_dir, pattern)))]
+    files = referenced_files(site_dir, pages)
+    files.update(search_files(site_dir))
+    entries = cache_entries(site_dir, files)
+    worker = render(SW_NAME, entries=json.dumps(entries, separators=(',', ':')))
+    OutputWriter().write(os.path.join(site_dir, SW_NAME), worker)
+    precached = [e for e in entries if e[2] == 'precache']
+    print(f"Service worker: {len(precached)} file(s) precached, {len(entries) - len(precached)} cached at runtime")
+
+def main():
+    run(sys.argv[1] if len(sys.argv) > 1 else SITE_DIR)
+
+if __name__ == "__main__":
+    main()
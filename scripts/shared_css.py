@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+import glob
+import os
+import re
+
+from build_cache import OutputWriter, hash_text
+
+SOURCE = os.path.join('templates', 'project.css')
+ASSETS_DIR = 'assets'
+PREFIX = 'project.'
+
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+RULE_RE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+STYLE_RE = re.compile(r'[ \t]*<style>(.*?)</style>\n?', re.DOTALL)
+LINK_RE = re.compile(r'[ \t]*<link rel="stylesheet" href="[^"]*' + re.escape(PREFIX) + r'[0-9a-f]+\.css">\n?')
+
+_stylesheet = None
+
+def _normalize(text):
+    return ' '.join(text.split())
+
+def rule_key(selector, body):
+    """Whitespace-insensitive identity of a CSS rule"""
+    decls = [_normalize(d) for d in body.split(';') if d.strip()]
+    return _normalize(selector), tuple(decls)
+
+def parse_rules(css):
+    """Split flat CSS into (selector, body) pairs"""
+    css = COMMENT_RE.sub('', css)
+    return [(m.group(1).strip(), m.group(2)) for m in RULE_RE.finditer(css)]
+
+def load_stylesheet():
+    """Return (css, fingerprinted filename, shared rule keys), read once per process"""
+    global _stylesheet
+    if _stylesheet is None:
+        with open(SOURCE, 'r') as f:
+            css = f.read()
+        filename = f"{PREFIX}{hash_text(css)[:10]}.css"
+        keys = {rule_key(selector, body) for selector, body in parse_rules(css)}
+        _stylesheet = css, filename, keys
+    return _stylesheet
+
+def stylesheet_name():
+    return load_stylesheet()[1]
+
+def stylesheet_href(page_dir='projects'):
+    """Relative URL of the shared stylesheet from a page in page_dir"""
+    return os.path.relpath(os.path.join(ASSETS_DIR, stylesheet_name()), page_dir).replace(os.sep, '/')
+
+def publish_stylesheet():
+    """Write the fingerprinted stylesheet next to assets/style.css and drop stale ones"""
+    css, filename, _ = load_stylesheet()
+    path = os.path.join(ASSETS_DIR, filename)
+    for old in glob.glob(os.path.join(ASSETS_DIR, PREFIX + '*.css')):
+        if old != path:
+            os.remove(old)
+    if OutputWriter().write(path, css):
+        print(f"Created: {path}")
+    return path
+
+def extract_shared_rules(html, page_dir='projects'):
+    """Link the shared stylesheet and keep only page-specific rules inline"""
+    _, _, shared = load_stylesheet()
+    link = f'    <link rel="stylesheet" href="{stylesheet_href(page_dir)}">\n'
+    match = STYLE_RE.search(html)
+    if not match:
+        if LINK_RE.search(html):
+            return LINK_RE.sub(lambda m: link, html, count=1)
+        return html
+
+    own = []
+    for selector, body in parse_rules(match.group(1)):
+        if rule_key(selector, body) not in shared:
+            own.append(f"        {selector} {{{body}}}")
+    replacement = link
+    if own:
+        replacement += "    <style>\n" + "\n        \n".join(own) + "\n    </style>\n"
+
+    html = LINK_RE.sub('', html)
+    match = STYLE_RE.search(html)
+    return html[:match.start()] + replacement + html[match.end():]
+
+def main():
+    publish_stylesheet()
+    writer = OutputWriter()
+    for filepath in sorted(glob.glob(os.path.join('projects', '*.html'))):
+        with open(filepath, 'r') as f:
+            content = f.read()
+        updated = extract_shared_rules(content, os.path.dirname(filepath))
+        if writer.write(filepath, updated):
+            print(f"Updated: {filepath}")
+    print(writer.summary())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import importlib
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import profiling
+from build_cache import BuildCache, OutputWriter
+from profiling import count, span
+from shared_css import publish_stylesheet
+
+OUTPUT_DIR = 'projects'
+SITE_DIR = '_site'
+
+# Files copied into the publishable site tree
+SITE_FILES = ['*.html', '.nojekyll', 'projects/*.html', 'assets/*']
+SITE_PAGES = ['index.html', 'projects.html', 'projects/*.html']
+
+COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+# Name, then an optional double-quoted, single-quoted or unquoted value
+ATTR_RE = re.compile(r'''([^\s"'<>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?''')
+TAG_NAME_RE = re.compile(r'<\s*[^\s/>]+')
+EXTERNAL_RE = re.compile(r'^[a-z][a-z0-9+.-]*:|^//', re.IGNORECASE)
+
+# Generators whose pages make up the site, in build order
+GENERATORS = [
+    'create_real_project_pages',
+]
+
+# Generators of placeholder pages (stock descriptions, no committed
+# counterpart); they only run when named on the command line
+PLACEHOLDER_GENERATORS = [
+    'create_emnlp2025_page',
+    'generate_project_pages',
+    'generate_updated_project_pages',
+]
+
+# Post-processing stages run over the site tree, in order; each module
+# exposes run(site_dir)
+STAGES = [
+    'postprocess',
+    'prerender_math',
+    'responsive_images',
+    'gif_to_video',
+    'video_delivery',
+    'critical_css',
+    'resource_hints',
+    'minify',
+    'search_index',
+    'asset_manifest',
+    'service_worker',
+]
+
+class Target:
+    """One output page: a render function plus the content hashes it depends on"""
+
+    def __init__(self, key, render, args=(), inputs=None):
+        self.key = key
+        self.render = render
+        self.args = args
+        self.inputs = inputs or {}
+
+def _render(target):
+    with span('page:render', key=target.key):
+        return target.render(*target.args)
+
+def render_all(targets, jobs=1):
+    """Yield rendered (filename, content) pairs in target order.
+
+    With jobs > 1 the render calls are fanned out over a process pool;
+    results still come back in order so a single writer can consume them.
+    jobs=0 uses every core.
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1 or len(targets) < 2:
+        for target in targets:
+            yield _render(target)
+        return
+    chunksize = max(1, len(targets) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(_render, targets, chunksize=chunksize)
+
+def build(targets, force=False, cache=None, jobs=1, writer=None):
+    """Render the targets whose inputs changed since the last build.
+
+    Rendered pages go through an OutputWriter, so a page that renders to
+    the same bytes as before is not rewritten. Two targets rendering the
+    same file raise ValueError instead of overwriting each other.
+    """
+    cache = cache or BuildCache()
+    writer = writer or OutputWriter()
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    # Inputs every page shares; a new stylesheet fingerprint rebuilds them all
+    shared = {'stylesheet': publish_stylesheet()}
+    for target in targets:
+        target.inputs = dict(target.inputs, **shared)
+    with span('build:freshness', targets=len(targets)):
+        stale = [t for t in targets if force or not cache.is_fresh(t.key, t.inputs)]
+    # Output of each target; up-to-date ones keep the file they last wrote
+    owners = {cache.targets[t.key]['output']: t.key for t in targets if t not in stale}
+    for target, (filename, content) in zip(stale, render_all(stale, jobs)):
+        filepath = os.path.join(OUTPUT_DIR, filename)
+        if owners.setdefault(filepath, target.key) != target.key:
+            raise ValueError(f"{target.key} and {owners[filepath]} both write {filepath}")
+
+        with span('page:write', file=filepath):
+            written = writer.write(filepath, content)
+        if written:
+            if profiling.enabled():
+                count('bytes_written', len(content.encode('utf-8')))
+            print(f"Created: {filepath}")
+
+        cache.record(target.key, filepath, target.inputs, content)
+    with span('build:save_cache'):
+        cache.save()
+    if stale:
+        print(f"Pages: {writer.summary()}")
+    return len(stale), len(targets) - len(stale)
+
+def add_jobs_argument(parser):
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="render pages in N worker processes (0 = all cores)")
+
+def stage_site(site_dir=SITE_DIR):
+    """Copy the publishable files into site_dir.
+
+    Pages are always refreshed because the stages rewrite them in place;
+    other files are only copied when their size or mtime changed.
+    """
+    for pattern in SITE_FILES:
+        for src in glob.glob(pattern):
+            if not os.path.isfile(src):
+                continue
+            dest = os.path.join(site_dir, src)
+            if not src.endswith('.html') and os.path.exists(dest):
+                st, dst = os.stat(src), os.stat(dest)
+                if st.st_size == dst.st_size and st.st_mtime_ns == dst.st_mtime_ns:
+                    continue
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            shutil.copy2(src, dest)
+
+def rewrite_pages(site_dir, transform, patterns=SITE_PAGES):
+    """Apply transform(html, filepath) to each site page, writing only changed ones"""
+    writer = OutputWriter()
+    for pattern in patterns:
+        for filepath in sorted(glob.glob(os.path.join(site_dir, pattern))):
+            with span('page:rewrite', file=filepath):
+                with open(filepath, 'r') as f:
+                    content = f.read()
+                updated = transform(content, filepath)
+                if updated != content:
+                    writer.write(filepath, updated)
+                    if profiling.enabled():
+                        count('bytes_written', len(updated.encode('utf-8')))
+                    print(f"Updated: {filepath}")
+
+def parse_attrs(tag):
+    """Ordered attribute dict of a start tag; boolean attributes map to None.
+
+    The first occurrence of a repeated attribute wins, as in browsers.
+    """
+    name = TAG_NAME_RE.match(tag)
+    end = len(tag) - (tag.endswith('>') + tag.endswith('/>'))
+    attrs = {}
+    for m in ATTR_RE.finditer(tag, name.end() if name else 0, end):
+        value = next((v for v in m.group(2, 3, 4) if v is not None), None)
+        attrs.setdefault(m.group(1).lower(), value)
+    return attrs
+
+def format_attrs(attrs):
+    """Attribute string of a dict from parse_attrs; boolean attributes are written bare"""
+    return ''.join(f' {k}' if v is None else f" {k}='{v}'" if '"' in v else f' {k}="{v}"'
+                   for k, v in attrs.items())
+
+def local_file(src, page_dir):
+    """Path of a page-relative reference, or None if it is external or missing"""
+    if not src or EXTERNAL_RE.match(src):
+        return None
+    path = os.path.normpath(os.path.join(page_dir, src))
+    return path if os.path.isfile(path) else None
+
+def sub_outside_comments(pattern, repl, html):
+    """pattern.sub(repl, html), leaving commented-out markup alone"""
+    comments = [(m.start(), m.end()) for m in COMMENT_RE.finditer(html)]
+
+    def replace(match):
+        if any(start <= match.start() < end for start, end in comments):
+            return match.group(0)
+        count('regex_subs')
+        return repl(match)
+
+    return pattern.sub(replace, html)
+
+def publish(site_dir=SITE_DIR, stages=STAGES):
+    """Assemble the site tree and run every post-processing stage over it"""
+    with span('stage:assemble'):
+        stage_site(site_dir)
+    for name in stages:
+        with span(f'stage:{name}'):
+            importlib.import_module(name).run(site_dir)
+
+def collect_targets(generators):
+    """Gather the page targets declared by each generator module"""
+    targets = []
+    for name in generators:
+        with span(f'collect:{name}'):
+            module = importlib.import_module(name)
+            targets.extend(module.page_targets())
+    return targets
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally build the project pages")
+    parser.add_argument('generators', nargs='*', default=GENERATORS,
+                        help="generator modules to build (default: the site's pages; name "
+                             f"any of {', '.join(PLACEHOLDER_GENERATORS)} to also write placeholder pages)")
+    parser.add_argument('--force', action='store_true', help="rebuild every page")
+    add_jobs_argument(parser)
+    parser.add_argument('--no-publish', action='store_true',
+                        help=f"only build projects/, skip assembling {SITE_DIR}/")
+    parser.add_argument('--profile', metavar='TRACE',
+                        help="record spans and counters, write a Chrome trace to TRACE and print a summary "
+                             "(page renders are only traced with -j 1)")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiling.enable()
+
+    start = time.perf_counter()
+    built, skipped = build(collect_targets(args.generators), force=args.force, jobs=args.jobs)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Built {built} page(s), {skipped} up to date in {elapsed:.1f} ms")
+    if not args.no_publish:
+        publish()
+    if args.profile:
+        profiler = profiling.disable()
+        profiling.write_chrome_trace(profiler, args.profile)
+        print(profiler.summary())
+        print(f"Trace written to {args.profile} (open in chrome://tracing or ui.perfetto.dev)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+import os
+import re
+
+from build_cache import hash_bytes
+from profiling import span
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+EXTENDS_RE = re.compile(r'^\s*\{%\s*extends\s+"([^"]+)"\s*%\}\n?')
+BLOCK_RE = re.compile(r'\{%\s*block\s+(\w+)\s*%\}(.*?)\{%\s*endblock\s*%\}', re.DOTALL)
+SLOT_RE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+_cache = {}
+
+class Template:
+    """A template compiled to a flat list of static chunks and named slots.
+
+    Rendering copies the precomputed chunk list, drops the context values
+    into the slot positions and joins the result; no parsing happens per call.
+    """
+
+    def __init__(self, name, source, sources):
+        self.name = name
+        self.sources = sources
+        parts = SLOT_RE.split(source)
+        self.chunks = parts
+        self.slots = [(i, parts[i]) for i in range(1, len(parts), 2)]
+
+    def render(self, **context):
+        out = list(self.chunks)
+        for i, slot in self.slots:
+            try:
+                out[i] = str(context[slot])
+            except KeyError:
+                raise KeyError(f"template {self.name!r} needs a value for {slot!r}") from None
+        return ''.join(out)
+
+def _read(name):
+    path = os.path.join(TEMPLATE_DIR, name)
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    # Like Jinja, drop the single newline that ends the template file
+    if source.endswith('\n'):
+        source = source[:-1]
+    return path, source
+
+def _resolve(name, overrides=None):
+    """Flatten a template's extends chain into one source string.
+
+    Blocks defined further down the chain win; blocks nobody overrides
+    render their default content from the layout.
+    """
+    path, source = _read(name)
+    blocks = {}
+    match = EXTENDS_RE.match(source)
+    if match:
+        blocks = {m.group(1): m.group(2) for m in BLOCK_RE.finditer(source)}
+    blocks.update(overrides or {})
+    if match:
+        source, sources = _resolve(match.group(1), blocks)
+        return source, sources + [path]
+    return BLOCK_RE.sub(lambda m: blocks.get(m.group(1), m.group(2)), source), [path]
+
+def get_template(name):
+    """Return the compiled template, parsing it only on first use"""
+    template = _cache.get(name)
+    if template is None:
+        source, sources = _resolve(name)
+        template = _cache[name] = Template(name, source, sources)
+    return template
+
+def render(name, **context):
+    with span('template:render', template=name):
+        return get_template(name).render(**context)
+
+def template_hash(name):
+    """Content hash of a template and every layout it extends"""
+    digests = []
+    for path in get_template(name).sources:
+        with open(path, 'rb') as f:
+            digests.append(hash_bytes(f.read()))
+    return hash_bytes(''.join(digests).encode())
+
+def clear_cache():
+    """Forget compiled templates so edited sources are parsed again"""
+    _cache.clear()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import os
+import re
+import sys
+
+from media import FFMPEG, MEDIA_DIR, cached_outputs, install, media_url, probe_size
+from site_build import SITE_DIR, format_attrs, local_file, parse_attrs, rewrite_pages, sub_outside_comments
+
+VIDEO_RE = re.compile(r'<video\b[^>]*>(.*?)</video>', re.IGNORECASE | re.DOTALL)
+SOURCE_RE = re.compile(r'<source\b[^>]*>', re.IGNORECASE)
+# A later <source>, with the indentation before it
+LATER_SOURCE_RE = re.compile(r'\s*<source\b[^>]*>', re.IGNORECASE)
+
+VIDEO_TYPES = {'.mp4': 'video/mp4', '.webm': 'video/webm', '.mov': 'video/quicktime'}
+
+# Rendition heights, smallest first, with the viewport each one is meant
+# for; wider viewports get the original file
+RENDITIONS = [
+    (360, '(max-width: 480px)'),
+    (540, '(max-width: 960px)'),
+    (720, '(max-width: 1280px)'),
+]
+
+POSTER_OUTPUT = {'-poster.jpg': ['-ss', '1', '-frames:v', '1', '-q:v', '4']}
+
+def rendition_outputs(height):
+    return {f'-{height}p.mp4': ['-vf', f'scale=-2:{height}', '-c:v', 'libx264', '-pix_fmt', 'yuv420p',
+                                '-crf', '26', '-preset', 'slow', '-c:a', 'aac', '-b:a', '96k',
+                                '-movflags', '+faststart']}
+
+def deliver_video(match, page_dir, site_dir):
+    """Give a click-to-play <video> a poster, preload="none" and sized renditions.
+
+    Only the <source> children are replaced: the renditions come first,
+    each for the viewports it suits, and the original file stays as the
+    last, unconditioned source. Tracks and fallback content are kept.
+    """
+    tag = match.group(0)
+    attrs = parse_attrs(tag[:tag.index('>') + 1])
+    # Autoplaying loops (e.g. converted GIFs) are handled by their own stage
+    if 'autoplay' in attrs:
+        return tag
+    sources = [local_file(parse_attrs(s).get('src'), page_dir) for s in SOURCE_RE.findall(match.group(1))]
+    src = next((path for path in sources if path and path.lower().endswith(tuple(VIDEO_TYPES))), None)
+    # Missing, or already pointing at generated renditions
+    if not src or os.path.dirname(src) == os.path.normpath(os.path.join(site_dir, MEDIA_DIR)):
+        return tag
+
+    size = probe_size(src)
+    heights = [h for h, _ in RENDITIONS if not size or h < size[1]]
+    outputs = dict(POSTER_OUTPUT)
+    for height in heights:
+        outputs.update(rendition_outputs(height))
+    names = cached_outputs(src, outputs)
+    install(names.values(), site_dir)
+
+    attrs.setdefault('poster', media_url(names['-poster.jpg'], page_dir, site_dir))
+    attrs['preload'] = 'none'
+
+    lines = []
+    for height, media in RENDITIONS:
+        if height in heights:
+            url = media_url(names[f'-{height}p.mp4'], page_dir, site_dir)
+            lines.append(f'<source src="{url}" type="video/mp4" media="{media}">')
+    url = os.path.relpath(src, page_dir).replace(os.sep, '/')
+    lines.append(f'<source src="{url}" type="{VIDEO_TYPES[os.path.splitext(src)[1].lower()]}">')
+
+    inner = match.group(1)
+    first = SOURCE_RE.search(inner)
+    inner = inner[:first.start()] + ''.join(lines) + LATER_SOURCE_RE.sub('', inner[first.end():])
+    return f'<video{format_attrs(attrs)}>{inner}</video>'
+
+def run(site_dir):
+    """Rewrite every local click-to-play <video> in the site tree"""
+    if FFMPEG is None:
+        print("ffmpeg not found; skipping video renditions", file=sys.stderr)
+        return
+
+    def transform(html, filepath):
+        page_dir = os.path.dirname(filepath)
+        return sub_outside_comments(VIDEO_RE, lambda m: deliver_video(m, page_dir, site_dir), html)
+
+    rewrite_pages(site_dir, transform)
+
+def main():
+    run(sys.argv[1] if len(sys.argv) > 1 else SITE_DIR)
+
+if __name__ == "__main__":
+    main()
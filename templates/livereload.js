@@ -0,0 +1,18 @@
+// Injected into pages by scripts/serve.py. Events name the pages and
+// stylesheets that changed: stylesheets are swapped in place, and the
+// page reloads only when it is one of the changed pages.
+(function () {
+  const here = decodeURIComponent(location.pathname.replace(/\/$/, '/index.html')).slice(1);
+  const events = new EventSource('/__livereload');
+  events.onmessage = event => {
+    const change = JSON.parse(event.data);
+    for (const link of document.querySelectorAll('link[rel="stylesheet"]')) {
+      const url = new URL(link.href);
+      if (url.origin === location.origin && (change.css || []).includes(decodeURIComponent(url.pathname).slice(1))) {
+        url.searchParams.set('livereload', Date.now());
+        link.href = url.href;
+      }
+    }
+    if (change.reload === '*' || (change.reload || []).includes(here)) location.reload();
+  };
+})();
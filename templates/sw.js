@@ -0,0 +1,82 @@
+// Generated by scripts/service_worker.py from templates/sw.js
+// Entries are [url, revision, mode]; mode is "precache" (fetched at
+// install) or "runtime" (cached the first time it is requested).
+const ENTRIES = {{ entries }};
+const CACHE_NAME = 'site';
+
+const scope = self.registration.scope;
+const revisions = new Map(ENTRIES.map(([url, rev]) => [new URL(url, scope).href, rev]));
+const keyFor = (href, rev) => `${href}?__rev=${rev}`;
+
+self.addEventListener('install', event => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(CACHE_NAME);
+    // Entries whose content hash is unchanged are already cached under
+    // the same key, so a deploy only downloads what changed
+    await Promise.all(ENTRIES.filter(([, , mode]) => mode === 'precache').map(async ([url, rev]) => {
+      const href = new URL(url, scope).href;
+      if (await cache.match(keyFor(href, rev))) return;
+      const response = await fetch(href, {cache: 'reload'});
+      if (!response.ok) throw new Error(`precache ${url}: ${response.status}`);
+      await cache.put(keyFor(href, rev), response);
+    }));
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(CACHE_NAME);
+    const current = new Set(ENTRIES.map(([url, rev]) => keyFor(new URL(url, scope).href, rev)));
+    for (const request of await cache.keys()) {
+      if (!current.has(request.url)) await cache.delete(request);
+    }
+    await self.clients.claim();
+  })());
+});
+
+function lookup(request) {
+  const url = new URL(request.url);
+  url.search = '';
+  url.hash = '';
+  if (url.pathname.endsWith('/')) url.pathname += 'index.html';
+  const rev = revisions.get(url.href);
+  return rev && {href: url.href, key: keyFor(url.href, rev)};
+}
+
+// Answer a Range request (video seeking) from a complete cached response
+async function partial(response, range) {
+  const match = /bytes=(\d+)-(\d*)/.exec(range);
+  if (!match) return response;
+  const body = await response.blob();
+  const start = Number(match[1]);
+  const end = Math.min(match[2] ? Number(match[2]) : body.size - 1, body.size - 1);
+  return new Response(body.slice(start, end + 1), {
+    status: 206,
+    headers: {
+      'Content-Type': response.headers.get('Content-Type') || '',
+      'Content-Range': `bytes ${start}-${end}/${body.size}`,
+      'Content-Length': String(end - start + 1),
+    },
+  });
+}
+
+async function respond(request, entry) {
+  const cache = await caches.open(CACHE_NAME);
+  const range = request.headers.get('range');
+  let response = await cache.match(entry.key);
+  if (!response) {
+    // Fetched whole (entry.href carries no Range header), so a video
+    // played once is cached and can be seeked offline
+    response = await fetch(entry.href);
+    if (response.status !== 200) return range ? fetch(request) : response;
+    await cache.put(entry.key, response.clone());
+  }
+  return range ? partial(response, range) : response;
+}
+
+self.addEventListener('fetch', event => {
+  if (event.request.method !== 'GET') return;
+  const entry = lookup(event.request);
+  if (entry) event.respondWith(respond(event.request, entry));
+});